@@ -0,0 +1,33 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+
+def get_cache_version(namespace):
+    """Versión actual de un grupo de claves; cambia cada vez que se invalida."""
+    return cache.get_or_set(f"{namespace}:version", 1, None)
+
+
+def bump_cache_version(namespace):
+    """Invalida todas las claves del grupo sin tener que borrarlas una a una."""
+    key = f"{namespace}:version"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def queryset_fingerprint(*querysets):
+    """
+    Huella del contenido de los querysets a partir del `updated_at` más
+    reciente y del número de filas (para notar también los borrados).
+    Sirve para armar claves de caché válidas entre procesos.
+    """
+    parts = []
+    for queryset in querysets:
+        data = queryset.order_by().aggregate(
+            last_update=Max("updated_at"), total=Count("pk")
+        )
+        parts.append(f"{data['last_update']}:{data['total']}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,36 @@
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """ETag a partir de valores baratos de obtener (versiones, huellas, rutas)."""
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32])
+
+
+def etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    # Comparación débil: se ignora el prefijo W/ que agregan algunos proxies
+    tags = {tag.removeprefix("W/") for tag in parse_etags(header)}
+    return "*" in tags or etag in tags
+
+
+def conditional_response(request, etag, build, private=False):
+    """
+    GET condicional: si el cliente ya tiene la versión `etag` responde
+    304 sin llamar a `build`; si no, usa la respuesta que arma `build()`.
+    Las respuestas `private` dependen del usuario y no deben guardarse en
+    cachés compartidas.
+    """
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = build()
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache" if private else "no-cache"
+    return response
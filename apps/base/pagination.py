@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) ordenada por `(created_at, id)`. Cada
+    página filtra desde el `created_at` del cursor usando el índice, así que
+    una página profunda cuesta lo mismo que la primera y el cursor no se
+    desplaza cuando se insertan registros nuevos. El cursor de DRF solo
+    guarda el primer campo del orden: los registros con el mismo
+    `created_at` se saltan con un desplazamiento dentro del cursor. `id` no
+    entra en el cursor; solo fija un orden estable entre esos empates para
+    que el desplazamiento salte siempre los mismos registros.
+    """
+
+    ordering = ("created_at", "id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class RankedPagination(KeysetPagination):
+    """Igual que `KeysetPagination`, pero ordena por la relevancia `rank`."""
+
+    ordering = ("-rank", "created_at")
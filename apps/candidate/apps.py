@@ -5,3 +5,5 @@ class CandidateConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.candidate'
 
+    def ready(self):
+        import apps.candidate.signals
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.candidate.models import Candidate
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula Candidate.cv_sha256 de los CVs subidos antes de que existiera "
+        "el campo, para que se puedan enviar al evaluador por huella."
+    )
+
+    def handle(self, *args, **options):
+        queryset = (
+            Candidate.objects.filter(cv_sha256__isnull=True)
+            .exclude(cv_file="")
+            .exclude(cv_file__isnull=True)
+            .only("pk", "cv_file", "cv_sha256")
+        )
+        updated = sum(
+            1 for candidate in queryset.iterator() if candidate.ensure_cv_sha256()
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ {updated} CVs actualizados"))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0016_candidate_experience_years'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='cv_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Huella del CV (SHA-256)'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0017_candidate_cv_sha256'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidateskill',
+            index=models.Index(fields=['created_at', 'id'], name='candidate_skill_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificates',
+            index=models.Index(fields=['created_at', 'id'], name='certificates_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['created_at', 'id'], name='education_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['created_at', 'id'], name='experience_keyset_idx'),
+        ),
+    ]
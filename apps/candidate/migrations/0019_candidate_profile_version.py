@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0018_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='profile_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Versión del perfil'),
+        ),
+    ]
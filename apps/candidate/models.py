@@ -1,4 +1,8 @@
+import hashlib
+import os
+
 from django.db import models
+from django.utils import timezone
 from apps.base.models import BaseModel
 from apps.maintenance.models import Skill
 from apps.candidate.choices import (
@@ -13,6 +17,13 @@ from apps.users.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+def file_sha256(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
 class Candidate(BaseModel):
     user = models.ForeignKey(
         User,
@@ -70,6 +81,13 @@ class Candidate(BaseModel):
     short_bio = models.TextField(verbose_name="Breve biografía", blank=True, null=True)
 
     cv_file = models.FileField(upload_to="candidates/cv/", blank=True, null=True)
+    cv_sha256 = models.CharField(
+        verbose_name="Huella del CV (SHA-256)",
+        max_length=64,
+        blank=True,
+        null=True,
+        editable=False,
+    )
     linkedin_url = models.URLField(blank=True, null=True)
     portfolio_url = models.URLField(blank=True, null=True)
     experience_years = models.CharField(
@@ -84,6 +102,11 @@ class Candidate(BaseModel):
         null=True,
         choices=TypeJobChoices.choices,
     )
+    # Sube con cada cambio del candidato o de sus skills, experiencias,
+    # educación y certificados; basta compararlo para saber si el perfil cambió
+    profile_version = models.PositiveIntegerField(
+        verbose_name="Versión del perfil", default=0, editable=False
+    )
 
     class Meta:
         verbose_name = "Candidato"
@@ -93,6 +116,62 @@ class Candidate(BaseModel):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # La huella del CV se calcula una sola vez, al subir el archivo
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "cv_file" in update_fields:
+            if not self.cv_file:
+                self.cv_sha256 = None
+            elif not self.cv_file._committed:
+                self.cv_sha256 = file_sha256(self.cv_file)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "cv_sha256"}
+
+        # El incremento lo hace la base de datos en el mismo UPDATE, así una
+        # instancia cargada antes de otro cambio no puede retroceder la
+        # versión. En memoria queda el valor esperado, sin volver a leerlo.
+        bump_version = not self._state.adding
+        if bump_version:
+            previous = self.__dict__.get("profile_version")
+            self.profile_version = models.F("profile_version") + 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "profile_version"}
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            if bump_version:
+                self._set_profile_version(previous)
+            raise
+        if bump_version:
+            self._set_profile_version(None if previous is None else previous + 1)
+
+    def _set_profile_version(self, value):
+        if value is None:
+            # Queda diferido: se lee de la base solo si alguien lo usa
+            self.__dict__.pop("profile_version", None)
+        else:
+            self.profile_version = value
+
+    @classmethod
+    def bump_profile_version(cls, candidate_ids):
+        """Marca los perfiles como modificados sin cargar ni guardar los candidatos."""
+        return cls.objects.filter(pk__in=candidate_ids).update(
+            profile_version=models.F("profile_version") + 1,
+            updated_at=timezone.now(),
+        )
+
+    def ensure_cv_sha256(self):
+        """Calcula la huella de un CV subido antes de que existiera el campo."""
+        if self.cv_sha256 or not self.cv_file:
+            return self.cv_sha256
+        if not os.path.exists(self.cv_file.path):
+            return None
+
+        self.cv_sha256 = file_sha256(self.cv_file)
+        self.cv_file.close()
+        Candidate.objects.filter(pk=self.pk).update(cv_sha256=self.cv_sha256)
+        return self.cv_sha256
+
     def update_experience_years(self):
         from datetime import date
 
@@ -131,6 +210,9 @@ class CandidateSkill(BaseModel):
         verbose_name = "Habilidad"
         verbose_name_plural = "Habilidades"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="candidate_skill_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"{self.candidate} - {self.skill} ({self.proficiency_level})"
@@ -150,6 +232,9 @@ class Experience(BaseModel):
         verbose_name = "Experiencia"
         verbose_name_plural = "Experiencias"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="experience_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"{self.position} en {self.company_name}"
@@ -183,6 +268,9 @@ class Certificates(BaseModel):
         verbose_name = "Certificado"
         verbose_name_plural = "Certificados"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="certificates_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.institution}"
@@ -213,6 +301,9 @@ class Education(BaseModel):
         verbose_name = "Educación"
         verbose_name_plural = "Educaciones"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="education_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"{self.degree} en {self.institution}"
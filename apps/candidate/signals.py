@@ -0,0 +1,69 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.candidate.models import (
+    Candidate,
+    CandidateSkill,
+    Certificates,
+    Education,
+    Experience,
+)
+
+# Tablas hijas que forman parte del perfil del candidato
+PROFILE_MODELS = (CandidateSkill, Experience, Education, Certificates)
+
+# Candidatos marcados en la transacción en curso y candidatos que se están
+# borrando, por hilo
+_pending = threading.local()
+_deleting = threading.local()
+
+
+def bump_candidate_profile(sender, instance, **kwargs):
+    # Al borrar el candidato se borran en cascada sus hijos; no hay perfil
+    # que versionar
+    if instance.candidate_id in getattr(_deleting, "ids", ()):
+        return
+    schedule_profile_bump(instance.candidate_id)
+
+
+def schedule_profile_bump(candidate_id):
+    """
+    Agrega el candidato a los que se actualizan al confirmar la transacción:
+    varios cambios en sus hijos suben la versión con un solo UPDATE.
+    """
+    connection = transaction.get_connection()
+    # Si la transacción se revirtió, Django ya descartó el callback anterior
+    scheduled = any(
+        callback[1] is bump_pending_profiles for callback in connection.run_on_commit
+    )
+    if not scheduled:
+        _pending.ids = set()
+    _pending.ids.add(candidate_id)
+    if not scheduled:
+        transaction.on_commit(bump_pending_profiles)
+
+
+def bump_pending_profiles():
+    ids, _pending.ids = _pending.ids, set()
+    if ids:
+        Candidate.bump_profile_version(ids)
+
+
+for model in PROFILE_MODELS:
+    post_save.connect(bump_candidate_profile, sender=model)
+    post_delete.connect(bump_candidate_profile, sender=model)
+
+
+@receiver(pre_delete, sender=Candidate)
+def start_candidate_delete(sender, instance, **kwargs):
+    if not hasattr(_deleting, "ids"):
+        _deleting.ids = set()
+    _deleting.ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Candidate)
+def finish_candidate_delete(sender, instance, **kwargs):
+    _deleting.ids.discard(instance.pk)
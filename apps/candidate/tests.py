@@ -1,3 +1,49 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from apps.candidate.models import Candidate, CandidateSkill
+from apps.maintenance.models import Skill
+
+
+class ProfileVersionTests(TestCase):
+    def setUp(self):
+        self.candidate = Candidate.objects.create(name="Ana", document_number="1")
+        self.skills = [
+            Skill.objects.create(name=f"Skill {i}", category="Técnica")
+            for i in range(3)
+        ]
+
+    def add_skills(self):
+        # Con captureOnCommitCallbacks se ejecuta el incremento agendado
+        with self.captureOnCommitCallbacks(execute=True):
+            for skill in self.skills:
+                CandidateSkill.objects.create(
+                    candidate=self.candidate, skill=skill, proficiency_level=2
+                )
+
+    def test_save_bumps_version_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.candidate.save()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.candidate.profile_version, 1)
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.profile_version, 1)
+
+    def test_child_changes_bump_version_once_per_transaction(self):
+        self.add_skills()
+
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.profile_version, 1)
+
+    def test_deleting_candidate_does_not_bump_its_children(self):
+        self.add_skills()
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.candidate.delete()
+
+        self.assertFalse(
+            any("profile_version" in q["sql"] for q in queries.captured_queries)
+        )
@@ -14,6 +14,8 @@ class CandidateViewSet(viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
     permission_classes = [IsAuthenticated]
+    # Solo retorna el candidato del usuario, no hace falta paginar
+    pagination_class = None
 
     # Opcional: filtrar solo el candidato del usuario logueado
     def get_queryset(self):
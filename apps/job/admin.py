@@ -9,6 +9,7 @@ from apps.base.admin import BaseAdmin
 from unfold.admin import TabularInline
 from apps.job.models import (
     AccuracyMetrics,
+    EvaluationJob,
     EvaluationSummary,
     JobPositions,
     JobOffers,
@@ -19,23 +20,20 @@ from apps.job.models import (
     JobBenefits,
     TimeMetrics,
 )
-from apps.job.choices import StatusChoices
+from apps.job.choices import (
+    EvaluationJobStatusChoices,
+    ResultChoices,
+    StatusChoices,
+)
+from apps.job.utils.metrics import flush_accuracy_metrics, throughput_by_offer_size
+from apps.job.utils.prescreening import PrescreeningEngine
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
-from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.http import HttpResponseNotAllowed, JsonResponse
 import json
-import requests
-from django.db.models import Prefetch
-from django.db.models.functions import TruncDate
-
-from apps.job.utils.utils import (
-    base64_pdf,
-    calculate_experience_years,
-    decide_status,
-    parse_time_str,
-)
-from collections import Counter
 
-API_URL = f"{settings.BACKIA}/api/evaluate"
+from collections import Counter
 
 class JobBenefitsInline(TabularInline):
     model = JobBenefits
@@ -147,6 +145,108 @@ class EvaluationSummaryAdmin(BaseAdmin):
 class AccuracyMetricsAdmin(BaseAdmin):
     model = AccuracyMetrics
 
+    def changelist_view(self, request, extra_context=None):
+        # Las fechas marcadas se recalculan al consultarlas, sin esperar al
+        # comando periódico; si no hay ninguna es una sola consulta.
+        flush_accuracy_metrics()
+        return super().changelist_view(request, extra_context)
+
+
+class TimeMetricsAdmin(BaseAdmin):
+    model = TimeMetrics
+    list_display = (
+        "created_at",
+        "job_offer",
+        "candidate_count",
+        "processing_time_seconds",
+        "processing_time_per_candidate",
+        "get_stage_timings",
+    )
+    list_filter = ("job_offer",)
+    search_fields = ("request_id", "job_offer__title")
+    readonly_fields = (
+        "job_offer",
+        "request_id",
+        "candidate_count",
+        "started_at",
+        "finished_at",
+        "processing_time_seconds",
+        "processing_time_per_candidate",
+        "stage_timings",
+        "candidate_processing_times",
+    )
+    exclude = ["job_application_batch"]
+    change_list_template = "admin/job/timemetrics_changelist.html"
+
+    def get_stage_timings(self, obj):
+        return ", ".join(
+            f"{name}: {seconds:.2f}s"
+            for name, seconds in (obj.stage_timings or {}).items()
+        )
+
+    get_stage_timings.short_description = "Etapas"
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        # Las estadísticas respetan los filtros aplicados en el listado
+        if hasattr(response, "context_data"):
+            queryset = response.context_data["cl"].queryset
+            response.context_data["throughput"] = throughput_by_offer_size(queryset)
+        return response
+
+
+class EvaluationJobAdmin(BaseAdmin):
+    model = EvaluationJob
+    list_display = (
+        "created_at",
+        "job_offer",
+        "show_status_customized_color",
+        "incremental",
+        "attempts",
+        "evaluated_count",
+        "total_count",
+        "started_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("job_offer__title",)
+    readonly_fields = (
+        "job_offer",
+        "status",
+        "incremental",
+        "attempts",
+        "worker",
+        "started_at",
+        "finished_at",
+        "total_count",
+        "evaluated_count",
+        "error",
+    )
+    exclude = ["state", "creator_user"]
+    actions = ["requeue"]
+
+    @display(
+        description="Estado",
+        ordering="status",
+        label={
+            EvaluationJobStatusChoices.QUEUED: "warning",
+            EvaluationJobStatusChoices.RUNNING: "info",
+            EvaluationJobStatusChoices.DONE: "success",
+            EvaluationJobStatusChoices.FAILED: "danger",
+        },
+    )
+    def show_status_customized_color(self, obj):
+        return obj.status
+
+    @admin.action(description="Reencolar evaluaciones seleccionadas")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(
+            status=EvaluationJobStatusChoices.RUNNING
+        ).update(status=EvaluationJobStatusChoices.QUEUED, error=None)
+        self.message_user(
+            request, f"{updated} evaluaciones reencoladas.", messages.SUCCESS
+        )
+
 
 
 
@@ -203,244 +303,75 @@ class JobApplicationsAdmin(BaseAdmin):
                 self.admin_site.admin_view(self.evaluate_offer),
                 name="jobapplications_evaluate_offer",
             ),
+            path(
+                "evaluation/<str:job_id>/",
+                self.admin_site.admin_view(self.evaluation_result),
+                name="jobapplications_evaluation_result",
+            ),
+            path(
+                "evaluation-progress/<str:job_id>/",
+                self.admin_site.admin_view(self.evaluation_progress),
+                name="jobapplications_evaluation_progress",
+            ),
+            path(
+                "prescreening/<str:offer_id>/",
+                self.admin_site.admin_view(self.prescreening),
+                name="jobapplications_prescreening",
+            ),
         ]
         return custom_urls + urls
 
     # EVALUACION
     def evaluate_offer(self, request, offer_id):
-        offer = JobOffers.objects.get(pk=offer_id)
-        applications = (
-            JobApplications.objects.filter(joboffers=offer)
-            .select_related("candidate")
-            .prefetch_related("analysis")
-        )
-
-        payload = {
-            "job_title": offer.title,
-            "job_description": offer.description,
-            "job_position": offer.job_position.name if offer.job_position else None,
-            "job_position_description": (
-                offer.job_position.description if offer.job_position else None
-            ),
-            "company": offer.company.name if offer.company else None,
-            "location": offer.location,
-            "start_date": str(offer.start_date) if offer.start_date else None,
-            "end_date": str(offer.end_date) if offer.end_date else None,
-            "is_active": offer.is_active,
-            "employment_type": offer.employment_type,
-            "salary_min": float(offer.salary_min) if offer.salary_min else None,
-            "salary_max": float(offer.salary_max) if offer.salary_max else None,
-            "mode": offer.mode,
-            "is_urgent": offer.is_urgent,
-            "candidates": [],
-        }
-
-        errors = []
-
-        for app in applications:
-            try:
-                candidate = app.candidate
-                if not candidate:
-                    raise ValueError("Candidato no asociado a la postulación")
-
-                created_at_str = app.created_at.isoformat() if app.created_at else None
-                # === SKILLS ===
-                ofimatic_map = {1: "Básico", 2: "Intermedio", 3: "Avanzado"}
-                skills_detail = [
-                    {
-                        "name": cs.skill.name,
-                        "category": cs.skill.category,
-                        "level": ofimatic_map.get(cs.proficiency_level, None),
-                    }
-                    for cs in candidate.skills.all()
-                    if cs.skill.category in ["Técnica", "Blanda"]
-                ]
-
-                languages_detail = [
-                    {
-                        "name": cs.skill.name,
-                        "level": ofimatic_map.get(cs.proficiency_level, None),
-                    }
-                    for cs in candidate.skills.all()
-                    if cs.skill.category == "Idioma"
-                ]
-
-                ofimatic_detail = [
-                    {
-                        "name": cs.skill.name,
-                        "level": ofimatic_map.get(cs.proficiency_level, None),
-                    }
-                    for cs in candidate.skills.all()
-                    if cs.skill.category == "Ofimática"
-                ]
-
-                # === EXPERIENCIAS ===
-                experiences = [
-                    exp.description or f"{exp.position} en {exp.company_name}"
-                    for exp in candidate.experiences.all()
-                ]
-                # university_name = (
-                #     candidate.educations.first().institution
-                #     if candidate.educations.exists()
-                #     else None
-                # )
-
-                # # 👇 Depuración
-                # print(f"   Universidad enviada → {university_name}\n")
-                # === ARMADO DE CANDIDATO ===
-                payload["candidates"].append(
-                    {
-                        "id": str(candidate.id),
-                        "name": candidate.name,
-                        "short_bio": candidate.short_bio,
-                        "experience": experiences,
-                        "education_level": candidate.education_level,
-                        "skills": skills_detail,
-                        "experience_years": calculate_experience_years(candidate),
-                        "certifications_count": candidate.certificates.count(),
-                        "languages": languages_detail,
-                        "ofimatic": ofimatic_detail,
-                        "cv_pdf_base64": base64_pdf(candidate.cv_file),
-                        "university_name": (
-                            candidate.educations.first().institution
-                            if candidate.educations.exists()
-                            else None
-                        ),
-                        "age": (
-                            (timezone.now().year - candidate.birth_date.year)
-                            if candidate.birth_date
-                            else None
-                        ),
-                        "availability": candidate.availability,
-                        "created_at": created_at_str,
-                    }
-                )
-
-            except Exception as e:
-                print(
-                    f"⚠️ Error con candidato {getattr(app.candidate, 'name', 'Desconocido')}: {e}"
-                )
-                errors.append(
-                    {
-                        "application_id": str(app.id),
-                        "candidate_name": getattr(app.candidate, "name", "Sin nombre"),
-                        "error": str(e),
-                    }
-                )
-                continue
-
-        # === ENVÍO A FASTAPI ===
-        try:
-            response = requests.post(
-                f"{API_URL}",
-                json=payload,
-                timeout=180,
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            selection_summary = result.get("selection_summary", [])
-
-            # === GUARDAR RESULTADOS ===
-            for c in result.get("candidates", []):
-                app = applications.get(candidate__id=c["id"])
-                score = c.get("fairness_overall_score", 0)
-                status = decide_status(score)
-
-                ApplicationsAiAnalysis.objects.create(
-                    jobApplications=app,
-                    job_match_score=c.get("job_match_score"),
-                    semantic_score=c.get("semantic_score"),
-                    structural_score=c.get("structural_score"),
-                    overall_score=score,
-                    fairness_structural_score=c.get("fairness_structural_score"),
-                    fairness_overall_score=c.get("fairness_overall_score"),
-                    fairness_overall_delta=c.get("fairness_overall_delta"),
-                    structural_breakdown=c.get("structural_breakdown"),
-                    fairness_groups=c.get("fairness_groups"),
-                    status=status,
-                    observation=c.get("decision_label"),
-                    processing_start_time=parse_time_str(
-                        c.get("processing_start_time")
-                    ),
-                    processing_end_time=parse_time_str(c.get("processing_end_time")),
-                    processing_time_minutes=round(
-                        float(c.get("processing_time_seconds", 0)), 2
-                    ),
-                )
-                app.status = status
-                app.save(update_fields=["status"])
-
-            # === GUARDAR SELECTION SUMMARY ===
-            if selection_summary:
-                EvaluationSummary.objects.filter(job_offer=offer).delete()
-                for summary in selection_summary:
-                    EvaluationSummary.objects.create(
-                        job_offer=offer,
-                        fecha=summary.get("fecha"),
-                        criterio=summary.get("criterio"),
-                        grupo_protegido=summary.get("grupo_protegido"),
-                        total_cvs_gp=summary.get("total_cvs_gp", 0),
-                        cvs_preseleccionados_gp=summary.get(
-                            "cvs_preseleccionados_gp", 0
-                        ),
-                        tasa_seleccion_gp=summary.get("tasa_seleccion_gp", 0),
-                        grupo_referente=summary.get("grupo_referente"),
-                        total_cvs_gr=summary.get("total_cvs_gr", 0),
-                        cvs_preseleccionados_gr=summary.get(
-                            "cvs_preseleccionados_gr", 0
-                        ),
-                        tasa_seleccion_gr=summary.get("tasa_seleccion_gr", 0),
-                        spd=summary.get("spd") or 0,
-                    )
-
-            # === GUARDAR MÉTRICAS DE EXACTITUD ===
-            dates = (
-                JobApplications.objects.filter(joboffers=offer)
-                .annotate(post_date=TruncDate("created_at"))
-                .values_list("post_date", flat=True)
-                .distinct()
+        # Encolar es un POST que redirige a la página del trabajo, así
+        # recargar esa página no encola otra evaluación
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+
+        offer = get_object_or_404(JobOffers, pk=offer_id)
+
+        # La evaluación se ejecuta en `run_evaluation_workers`; aquí solo se encola.
+        job = offer.evaluation_jobs.filter(
+            status__in=[
+                EvaluationJobStatusChoices.QUEUED,
+                EvaluationJobStatusChoices.RUNNING,
+            ]
+        ).first()
+        if job:
+            self.message_user(
+                request,
+                "Ya existe una evaluación pendiente para esta oferta.",
+                messages.WARNING,
             )
-
-            for d in dates:
-                apps_by_date = JobApplications.objects.filter(
-                    joboffers=offer, created_at__date=d
-                )
-                if not apps_by_date.exists():
-                    continue
-
-                metric, _ = AccuracyMetrics.objects.get_or_create(interview_date=d)
-                metric.job_applications.set(apps_by_date)
-                metric.calculate_metrics()
-
-            applications = (
-                JobApplications.objects.filter(joboffers=offer)
-                .select_related("candidate")
-                .prefetch_related(
-                    Prefetch(
-                        "analysis",
-                        queryset=ApplicationsAiAnalysis.objects.order_by("-created_at"),
-                    )
-                )
+        else:
+            job = EvaluationJob.objects.create(
+                job_offer=offer,
+                incremental=request.POST.get("incremental") == "1",
+                creator_user=request.user,
             )
-
             self.message_user(
                 request,
-                f"{applications.count()} postulaciones evaluadas con éxito.",
+                "La evaluación fue encolada. Los resultados se mostrarán al finalizar.",
                 messages.SUCCESS,
             )
 
-        except requests.RequestException as e:
-            print(f"❌ Error en la petición a IA: {e}")
-            result = {}
+        return redirect("admin:jobapplications_evaluation_result", job_id=job.pk)
+
+    def evaluation_result(self, request, job_id):
+        job = get_object_or_404(
+            EvaluationJob.objects.select_related("job_offer"), pk=job_id
+        )
+        offer = job.job_offer
+
+        applications = JobApplications.objects.filter(joboffers=offer).select_related(
+            "candidate", "latest_analysis"
+        )
 
         context = {
             "offer": offer,
+            "job": job,
             "applications": [
-                {
-                    "application": app,
-                    "analysis": app.analysis.first() if app.analysis.exists() else None,
-                }
+                {"application": app, "analysis": app.latest_analysis}
                 for app in applications
             ],
         }
@@ -449,6 +380,79 @@ class JobApplicationsAdmin(BaseAdmin):
             request, "admin/job/jobapplications_evaluate_result.html", context
         )
 
+    def evaluation_progress(self, request, job_id):
+        """
+        Avance de una evaluación para la página de resultados: candidatos
+        procesados sobre el total y los análisis guardados en esta corrida.
+        Con `since` (el `cursor` de la respuesta anterior) solo se envían los
+        análisis nuevos, así cada consulta cuesta lo mismo durante toda la
+        corrida.
+        """
+        job = get_object_or_404(EvaluationJob, pk=job_id)
+        since = parse_datetime(request.GET.get("since") or "")
+
+        analyses = []
+        if job.started_at:
+            # Los lotes se guardan uno tras otro, así que un análisis nuevo
+            # siempre es posterior al último que ya se envió
+            analyses = ApplicationsAiAnalysis.objects.filter(
+                jobApplications__joboffers_id=job.job_offer_id,
+                created_at__gte=job.started_at,
+            )
+            if since:
+                analyses = analyses.filter(created_at__gt=since)
+            analyses = list(
+                analyses.order_by("created_at").values_list(
+                    "jobApplications_id",
+                    "status",
+                    "overall_score",
+                    "created_at",
+                    named=True,
+                )
+            )
+        status_labels = dict(ResultChoices.choices)
+        cursor = analyses[-1].created_at if analyses else since
+
+        return JsonResponse(
+            {
+                "status": job.status,
+                "status_display": job.get_status_display(),
+                "finished": job.is_finished,
+                "processed": job.evaluated_count,
+                "total": job.total_count,
+                "error": job.error,
+                "cursor": cursor.isoformat() if cursor else None,
+                "analyses": [
+                    {
+                        "application_id": str(analysis.jobApplications_id),
+                        "status": analysis.status,
+                        "status_display": status_labels.get(
+                            analysis.status, analysis.status
+                        ),
+                        "overall_score": analysis.overall_score,
+                    }
+                    for analysis in analyses
+                ],
+            }
+        )
+
+    def prescreening(self, request, offer_id):
+        """
+        Ranking local de los postulantes (sin llamar al evaluador), para
+        revisar la preselección antes de enviar la oferta a evaluar.
+        """
+        offer = get_object_or_404(JobOffers, pk=offer_id)
+        engine = PrescreeningEngine(offer)
+
+        context = {
+            "offer": offer,
+            "threshold": settings.PRESCREENING_THRESHOLD,
+            "shortlist": engine.shortlist(),
+        }
+        return TemplateResponse(
+            request, "admin/job/jobapplications_prescreening.html", context
+        )
+
     def changelist_view(self, request, extra_context=None):
         extra_context = extra_context or {}
         extra_context["has_evaluate_button"] = False
@@ -463,3 +467,5 @@ admin.site.register(JobOffers, JobOffersAdmin)
 admin.site.register(JobApplications, JobApplicationsAdmin)
 admin.site.register(EvaluationSummary, EvaluationSummaryAdmin)
 admin.site.register(AccuracyMetrics, AccuracyMetricsAdmin)
+admin.site.register(EvaluationJob, EvaluationJobAdmin)
+admin.site.register(TimeMetrics, TimeMetricsAdmin)
@@ -29,4 +29,10 @@ class ResultChoices(TextChoices):
     RC = "Rechazado", "Rechazado"
     AP = "Aprobado", "Aprobado"
     EV = "Evaluado", "Evaluado"
-    EA = "En evaluación", "En evaluación"
\ No newline at end of file
+    EA = "En evaluación", "En evaluación"
+
+class EvaluationJobStatusChoices(TextChoices):
+    QUEUED = "queued", "En cola"
+    RUNNING = "running", "En proceso"
+    DONE = "done", "Completado"
+    FAILED = "failed", "Fallido"
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.job.models import JobApplications
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa JobApplications.latest_analysis con el análisis más reciente "
+        "de cada postulación."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Solo postulaciones sin último análisis asignado.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = JobApplications.objects.all()
+        if options["only_missing"]:
+            queryset = queryset.filter(latest_analysis__isnull=True)
+
+        updated = JobApplications.refresh_latest_analysis(queryset)
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {updated} postulaciones actualizadas")
+        )
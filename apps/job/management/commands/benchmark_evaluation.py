@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.candidate.models import (
+    Candidate,
+    CandidateSkill,
+    Certificates,
+    Education,
+    Experience,
+)
+from apps.job.models import JobApplications, JobOffers, JobPositions, TimeMetrics
+from apps.job.utils.evaluation import evaluate_offer
+from apps.job.utils.fake_evaluator import FakeEvaluator
+from apps.maintenance.models import Company, Skill
+
+SKILLS = [
+    ("Python", "Técnica"),
+    ("Django", "Técnica"),
+    ("SQL", "Técnica"),
+    ("Comunicación", "Blanda"),
+    ("Inglés", "Idioma"),
+    ("Excel", "Ofimática"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el flujo de evaluación (armado, envío, guardado y métricas) contra "
+        "un evaluador local, con ofertas de distinto número de postulantes. "
+        "Imprime una línea JSON por etapa y una con el total."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10, 100, 1000],
+            help="Número de postulantes de cada oferta.",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Retardo fijo del evaluador por petición (segundos).",
+        )
+        parser.add_argument(
+            "--per-candidate-latency",
+            type=float,
+            default=0.0,
+            help="Retardo del evaluador por candidato (segundos).",
+        )
+        parser.add_argument(
+            "--cv-size",
+            type=int,
+            default=64,
+            help="Tamaño de cada CV de prueba en KB.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Tamaño de lote; por defecto BACKIA_CHUNK_SIZE.",
+        )
+        parser.add_argument(
+            "--cv-by-digest",
+            action="store_true",
+            help="Usa el protocolo de CVs por huella (SHA-256).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Archivo donde escribir las líneas JSON (por defecto la salida estándar).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Conserva los datos generados (por defecto se revierten).",
+        )
+
+    def handle(self, *args, **options):
+        output = open(options["output"], "a") if options["output"] else self.stdout
+        try:
+            self.benchmark(output, options)
+        finally:
+            if options["output"]:
+                output.close()
+
+    def benchmark(self, output, options):
+        with ExitStack() as stack:
+            # Con --keep los CVs van al MEDIA_ROOT real, para que las rutas
+            # guardadas sigan siendo válidas al terminar
+            if options["keep"]:
+                media_root = settings.MEDIA_ROOT
+            else:
+                media_root = stack.enter_context(tempfile.TemporaryDirectory())
+            evaluator = stack.enter_context(
+                FakeEvaluator(
+                    latency=options["latency"],
+                    per_candidate_latency=options["per_candidate_latency"],
+                )
+            )
+            overrides = {
+                "MEDIA_ROOT": media_root,
+                "BACKIA": evaluator.url,
+                "BACKIA_CV_BY_DIGEST": options["cv_by_digest"],
+            }
+            if options["chunk_size"] is not None:
+                overrides["BACKIA_CHUNK_SIZE"] = options["chunk_size"]
+            stack.enter_context(override_settings(**overrides))
+
+            for size in options["sizes"]:
+                with transaction.atomic():
+                    offer = seed_offer(size, options["cv_size"] * 1024)
+
+                    # tracemalloc hace más lento todo lo que mide, así que la
+                    # memoria se mide en una pasada aparte que se revierte
+                    with transaction.atomic():
+                        peak = self.peak_memory(offer, evaluator)
+                        transaction.set_rollback(True)
+
+                    rows = self.run(offer, size, evaluator)
+                    rows[-1]["peak_memory_kb"] = round(peak / 1024, 1)
+                    for row in rows:
+                        output.write(json.dumps(row) + "\n")
+                    if not options["keep"]:
+                        transaction.set_rollback(True)
+
+    def peak_memory(self, offer, evaluator):
+        # El evaluador corre en un hilo del mismo proceso, así que la memoria
+        # incluye también lo que él recibe.
+        evaluator.cvs.clear()
+        tracemalloc.start()
+        try:
+            evaluate_offer(offer)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def run(self, offer, size, evaluator):
+        """
+        Ejecuta `evaluate_offer`, el mismo camino que los workers (cada lote
+        se guarda apenas llega), y retorna una fila por etapa según su
+        `TimeMetrics` más una fila con el total.
+        """
+        evaluator.cvs.clear()
+        bytes_before = evaluator.bytes_received
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            evaluate_offer(offer)
+            elapsed = time.perf_counter() - start
+
+        timings = TimeMetrics.objects.filter(job_offer=offer).latest("created_at")
+        rows = [
+            {"applicants": size, "stage": name, "wall_time_s": seconds}
+            for name, seconds in timings.stage_timings.items()
+        ]
+        rows.append(
+            {
+                "applicants": size,
+                "stage": "total",
+                "wall_time_s": round(elapsed, 4),
+                "queries": len(queries),
+                "bytes_sent": evaluator.bytes_received - bytes_before,
+            }
+        )
+        return rows
+
+
+def seed_offer(size, cv_size):
+    """Crea una oferta con `size` postulaciones, cada candidato con su CV."""
+    company, _ = Company.objects.get_or_create(
+        name="Benchmark",
+        defaults={
+            "legal_name": "Benchmark S.A.C.",
+            "tax_id": "00000000000",
+            "industry": "Benchmark",
+            "address": "Benchmark",
+            "phone": "000000000",
+            "email": "benchmark@example.com",
+            "size": "Grande",
+        },
+    )
+    position, _ = JobPositions.objects.get_or_create(
+        name="Benchmark", defaults={"description": "Posición de benchmark"}
+    )
+    skills = [
+        Skill.objects.get_or_create(name=name, defaults={"category": category})[0]
+        for name, category in SKILLS
+    ]
+    offer = JobOffers.objects.create(
+        title=f"Benchmark {size}",
+        description="Oferta generada por benchmark_evaluation",
+        job_position=position,
+        company=company,
+        is_active=True,
+    )
+
+    cv_dir = os.path.join("candidates", "cv", "benchmark")
+    os.makedirs(
+        os.path.join(Candidate.cv_file.field.storage.location, cv_dir), exist_ok=True
+    )
+    candidates = []
+    for i in range(size):
+        name = os.path.join(cv_dir, f"{offer.pk}-{i}.pdf")
+        path = Candidate.cv_file.field.storage.path(name)
+        content = b"%PDF-1.4\n" + os.urandom(cv_size)
+        with open(path, "wb") as f:
+            f.write(content)
+        candidates.append(
+            Candidate(
+                name=f"Postulante {i}",
+                document_number=str(i).zfill(8),
+                birth_date=date(1970 + i % 35, 1, 1),
+                short_bio="Perfil generado para el benchmark",
+                cv_file=name,
+                cv_sha256=hashlib.sha256(content).hexdigest(),
+            )
+        )
+    Candidate.objects.bulk_create(candidates)
+
+    rng = random.Random(size)
+    CandidateSkill.objects.bulk_create(
+        CandidateSkill(candidate=c, skill=skill, proficiency_level=rng.randint(1, 3))
+        for c in candidates
+        for skill in rng.sample(skills, 3)
+    )
+    Experience.objects.bulk_create(
+        Experience(
+            candidate=c,
+            company_name=f"Empresa {j}",
+            position="Desarrollador",
+            start_date=date(2015 + j, 1, 1),
+            end_date=date(2016 + j, 6, 1),
+        )
+        for c in candidates
+        for j in range(2)
+    )
+    Education.objects.bulk_create(
+        Education(candidate=c, institution="Universidad Benchmark", degree="Bachiller")
+        for c in candidates
+    )
+    Certificates.objects.bulk_create(
+        Certificates(candidate=c, name="Certificado", institution="Benchmark")
+        for c in candidates[::2]
+    )
+    JobApplications.objects.bulk_create(
+        JobApplications(candidate=c, joboffers=offer) for c in candidates
+    )
+    return offer
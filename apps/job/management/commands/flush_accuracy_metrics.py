@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import TruncDate
+
+from apps.job.models import AccuracyMetrics, JobApplications
+from apps.job.utils.metrics import flush_accuracy_metrics, recompute_accuracy_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula las métricas de exactitud de las fechas marcadas como "
+        "pendientes. Pensado para correr periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recalcula todas las fechas con postulaciones, no solo las pendientes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            # También las fechas que ya no tienen postulaciones, para ponerlas en cero
+            dates = set(
+                JobApplications.objects.annotate(post_date=TruncDate("created_at"))
+                .values_list("post_date", flat=True)
+                .distinct()
+                .order_by()
+            ) | set(AccuracyMetrics.objects.values_list("interview_date", flat=True))
+            recompute_accuracy_metrics(dates)
+        else:
+            dates = flush_accuracy_metrics()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(dates)} fechas recalculadas"))
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.job.models import CandidateSnapshot, JobApplications
+from apps.job.utils.snapshots import build_snapshots, store_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa JobApplications.snapshot en lotes, con un número fijo "
+        "de consultas por lote y bulk_update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help=(
+                "Reconstruye también los snapshots existentes con los datos "
+                "actuales del candidato (por defecto solo completa los faltantes)."
+            ),
+        )
+        parser.add_argument(
+            "--offer",
+            help="Solo las postulaciones de esta oferta.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Postulaciones por lote.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Borra al final los snapshots que ya no usa ninguna postulación.",
+        )
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=60,
+            help=(
+                "Con --prune, solo borra los snapshots sin usar desde hace al "
+                "menos estos minutos."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        queryset = JobApplications.objects.order_by("pk")
+        if not options["refresh"]:
+            queryset = queryset.filter(snapshot__isnull=True)
+        if options["offer"]:
+            queryset = queryset.filter(joboffers_id=options["offer"])
+
+        updated = 0
+        last_pk = None
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            applications = list(
+                chunk.only("id", "candidate_id")[: options["chunk_size"]]
+            )
+            if not applications:
+                break
+            last_pk = applications[-1].pk
+
+            digests = store_snapshots(
+                build_snapshots(app.candidate_id for app in applications)
+            )
+            for app in applications:
+                app.snapshot_id = digests.get(app.candidate_id)
+                app.has_snapshot = app.snapshot_id is not None
+            JobApplications.objects.bulk_update(
+                applications, ["snapshot", "has_snapshot"]
+            )
+            updated += len(applications)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {updated} postulaciones actualizadas")
+        )
+
+        if options["prune"]:
+            # Una postulación que se está guardando ya renovó `used_at` de su
+            # snapshot antes de asignarlo; el margen evita borrárselo
+            cutoff = timezone.now() - timedelta(minutes=options["grace_minutes"])
+            pruned, _ = CandidateSnapshot.objects.filter(
+                applications__isnull=True, used_at__lt=cutoff
+            ).delete()
+            self.stdout.write(self.style.SUCCESS(f"✅ {pruned} snapshots borrados"))
@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.job.models import EvaluationJob
+from apps.job.utils.evaluation import process_evaluation_job
+
+
+def stop_worker(signum, frame):
+    # Se ignoran las señales siguientes para que el trabajo en curso alcance
+    # a marcarse como fallido antes de salir
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise SystemExit(128 + signum)
+
+
+def worker_loop(poll_interval, once):
+    signal.signal(signal.SIGINT, stop_worker)
+    signal.signal(signal.SIGTERM, stop_worker)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"🚀 Worker {worker} iniciado")
+
+    while True:
+        job = EvaluationJob.claim_next(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"⏳ Evaluando oferta '{job.job_offer}' (trabajo {job.pk})")
+        process_evaluation_job(job)
+        print(f"✅ Trabajo {job.pk} → {job.get_status_display()}")
+
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de evaluaciones (EvaluationJob) en procesos worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.EVALUATION_WORKERS,
+            help="Número de procesos worker.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando la cola está vacía.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Procesa los trabajos en cola y termina.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        poll_interval = options["poll_interval"]
+        once = options["once"]
+
+        if workers == 1:
+            worker_loop(poll_interval, once)
+            return
+
+        # Las conexiones abiertas no se pueden compartir entre procesos.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=worker_loop, args=(poll_interval, once))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        signal.signal(signal.SIGTERM, stop_worker)
+        try:
+            for process in processes:
+                process.join()
+        except (KeyboardInterrupt, SystemExit):
+            # Cada worker marca como fallido el trabajo que tenía en curso
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
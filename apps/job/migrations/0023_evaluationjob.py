@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('job', '0022_accuracymetrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Registrado el')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Ultima actualización')),
+                ('state', models.BooleanField(default=True, verbose_name='Activo?')),
+                ('status', models.CharField(choices=[('queued', 'En cola'), ('running', 'En proceso'), ('done', 'Completado'), ('failed', 'Fallido')], db_index=True, default='queued', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('worker', models.CharField(blank=True, max_length=100, null=True, verbose_name='Worker')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Inicio de la evaluación')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin de la evaluación')),
+                ('evaluated_count', models.PositiveIntegerField(default=0, verbose_name='Postulaciones evaluadas')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('creator_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuario creador')),
+                ('job_offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_jobs', to='job.joboffers', verbose_name='Oferta laboral')),
+            ],
+            options={
+                'verbose_name': 'Evaluación en cola',
+                'verbose_name_plural': 'Evaluaciones en cola',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0023_evaluationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationsaianalysis',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Huella del contenido evaluado'),
+        ),
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='incremental',
+            field=models.BooleanField(default=False, verbose_name='¿Solo postulaciones nuevas o modificadas?'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def remove_duplicated_dates(apps, schema_editor):
+    AccuracyMetrics = apps.get_model('job', 'AccuracyMetrics')
+    seen = set()
+    for metric in AccuracyMetrics.objects.order_by('interview_date', '-updated_at'):
+        if metric.interview_date in seen:
+            metric.delete()
+        else:
+            seen.add(metric.interview_date)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0024_evaluation_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accuracymetrics',
+            name='average_score',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='Puntaje promedio'),
+        ),
+        migrations.RunPython(remove_duplicated_dates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='accuracymetrics',
+            name='interview_date',
+            field=models.DateField(default=django.utils.timezone.now, unique=True, verbose_name='Fecha de evaluación'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0025_accuracymetrics_unique_date_average_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timemetrics',
+            name='job_offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='time_metrics', to='job.joboffers', verbose_name='Oferta laboral'),
+        ),
+        migrations.AddField(
+            model_name='timemetrics',
+            name='stage_timings',
+            field=models.JSONField(blank=True, help_text='Objeto {query, encode, network, persist}', null=True, verbose_name='Duración por etapa (s)'),
+        ),
+    ]
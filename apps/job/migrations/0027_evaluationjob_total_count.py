@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0026_timemetrics_job_offer_stage_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='total_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Postulaciones a evaluar'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0027_evaluationjob_total_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplications',
+            name='latest_analysis',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='job.applicationsaianalysis', verbose_name='Último análisis'),
+        ),
+    ]
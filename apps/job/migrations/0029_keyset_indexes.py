@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0028_jobapplications_latest_analysis'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplications',
+            index=models.Index(fields=['created_at', 'id'], name='job_applications_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffers',
+            index=models.Index(fields=['created_at', 'id'], name='job_offers_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vector(apps, schema_editor):
+    JobOffers = apps.get_model('job', 'JobOffers')
+    JobPositions = apps.get_model('job', 'JobPositions')
+    Company = apps.get_model('maintenance', 'Company')
+    SearchVector = django.contrib.postgres.search.SearchVector
+
+    position = JobPositions.objects.filter(pk=OuterRef('job_position_id')).values('name')[:1]
+    company = Company.objects.filter(pk=OuterRef('company_id')).values('name')[:1]
+    JobOffers.objects.update(
+        search_vector=SearchVector('title', weight='A', config='spanish')
+        + SearchVector(Subquery(position), weight='A', config='spanish')
+        + SearchVector(Subquery(company), weight='B', config='spanish')
+        + SearchVector('description', weight='C', config='spanish')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0029_keyset_indexes'),
+        ('maintenance', '0007_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joboffers',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='joboffers',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='job_offers_search_idx'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
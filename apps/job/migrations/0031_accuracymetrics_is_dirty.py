@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0030_joboffers_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accuracymetrics',
+            name='is_dirty',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Pendiente de recalcular'),
+        ),
+    ]
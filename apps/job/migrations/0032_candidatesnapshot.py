@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:41
+
+import hashlib
+import json
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def canonical_digest(data):
+    canonical = json.dumps(
+        data,
+        cls=django.core.serializers.json.DjangoJSONEncoder,
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def move_snapshots(apps, schema_editor):
+    JobApplications = apps.get_model('job', 'JobApplications')
+    CandidateSnapshot = apps.get_model('job', 'CandidateSnapshot')
+
+    queryset = JobApplications.objects.filter(candidate_snapshot__isnull=False).order_by('pk')
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        applications = list(chunk.only('id', 'candidate_snapshot')[:500])
+        if not applications:
+            break
+        last_pk = applications[-1].pk
+
+        snapshots = {}
+        for app in applications:
+            app.snapshot_id = canonical_digest(app.candidate_snapshot)
+            snapshots[app.snapshot_id] = app.candidate_snapshot
+        CandidateSnapshot.objects.bulk_create(
+            [CandidateSnapshot(digest=digest, data=data) for digest, data in snapshots.items()],
+            ignore_conflicts=True,
+        )
+        JobApplications.objects.bulk_update(applications, ['snapshot'])
+
+
+def restore_snapshots(apps, schema_editor):
+    JobApplications = apps.get_model('job', 'JobApplications')
+    for app in JobApplications.objects.filter(snapshot__isnull=False).select_related('snapshot'):
+        app.candidate_snapshot = app.snapshot.data
+        app.save(update_fields=['candidate_snapshot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0031_accuracymetrics_is_dirty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSnapshot',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Huella (SHA-256)')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Datos del candidato')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Snapshot de candidato',
+                'verbose_name_plural': 'Snapshots de candidatos',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobapplications',
+            name='snapshot',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='applications', to='job.candidatesnapshot', verbose_name='Datos del candidato al momento de la postulación'),
+        ),
+        migrations.RunPython(move_snapshots, restore_snapshots),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0032_candidatesnapshot'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='jobapplications',
+            name='candidate_snapshot',
+        ),
+    ]
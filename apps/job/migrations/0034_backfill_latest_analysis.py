@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_latest_analysis(apps, schema_editor):
+    JobApplications = apps.get_model('job', 'JobApplications')
+    ApplicationsAiAnalysis = apps.get_model('job', 'ApplicationsAiAnalysis')
+
+    latest = (
+        ApplicationsAiAnalysis.objects.filter(jobApplications=OuterRef('pk'))
+        .order_by('-created_at')
+        .values('id')[:1]
+    )
+    JobApplications.objects.update(latest_analysis=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0033_remove_jobapplications_candidate_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_latest_analysis, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0034_backfill_latest_analysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatesnapshot',
+            name='used_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Último uso'),
+        ),
+    ]
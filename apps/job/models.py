@@ -1,7 +1,11 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from apps.base.models import BaseModel
 from apps.maintenance.models import Company, Skill
 from apps.job.choices import (
+    EvaluationJobStatusChoices,
     StatusInterviewChoices,
     TypeJobChoices,
     StatusChoices,
@@ -9,12 +13,20 @@ from apps.job.choices import (
     ModeChoices,
 )
 from apps.candidate.models import Candidate
+from apps.job.utils.snapshots import (
+    build_snapshots,
+    get_snapshot_data,
+    store_snapshots,
+)
 from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.utils import timezone
-from django.db.models import Q, Avg
+from django.db.models import Q, Avg, F, OuterRef, Subquery
+from django.db import transaction
 
 
 class JobPositions(BaseModel):
@@ -32,6 +44,24 @@ class JobPositions(BaseModel):
         return self.name
 
 
+SEARCH_CONFIG = "spanish"
+
+
+def offer_search_vector():
+    # UPDATE no admite campos de otras tablas, por eso la posición y la
+    # empresa se leen con subconsultas
+    position = JobPositions.objects.filter(pk=OuterRef("job_position_id")).values(
+        "name"
+    )[:1]
+    company = Company.objects.filter(pk=OuterRef("company_id")).values("name")[:1]
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Subquery(position), weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Subquery(company), weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
 class JobOffers(BaseModel):
     title = models.CharField(verbose_name="Nombre de oferta laboral", max_length=255)
     description = models.TextField(verbose_name="Descripción de oferta")
@@ -84,15 +114,29 @@ class JobOffers(BaseModel):
         choices=ModeChoices.choices,
     )
     is_urgent = models.BooleanField(verbose_name="Es uregente?", null=True, blank=True)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = "Oferta Laboral"
         verbose_name_plural = "Ofertas Laborales"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="job_offers_keyset_idx"),
+            GinIndex(fields=["search_vector"], name="job_offers_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def update_search_vector(cls, queryset=None):
+        """
+        Recalcula el vector de búsqueda (título, descripción, posición y
+        empresa, con stemming en español) con un solo UPDATE.
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.update(search_vector=offer_search_vector())
+
 
 class JobSkill(BaseModel):
     jobOffers = models.ForeignKey(
@@ -140,6 +184,32 @@ class JobBenefits(BaseModel):
         return self.description
 
 
+class CandidateSnapshot(models.Model):
+    """
+    Datos del candidato al momento de postular, guardados una sola vez por
+    contenido: la clave es el SHA-256 del JSON canónico, así las
+    postulaciones de un mismo perfil sin cambios comparten la fila.
+    """
+
+    digest = models.CharField(
+        verbose_name="Huella (SHA-256)", max_length=64, primary_key=True
+    )
+    data = models.JSONField(
+        verbose_name="Datos del candidato", encoder=DjangoJSONEncoder
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Se renueva cada vez que una postulación lo vuelve a usar; la limpieza
+    # solo borra los que no se usaron en un buen rato
+    used_at = models.DateTimeField(verbose_name="Último uso", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Snapshot de candidato"
+        verbose_name_plural = "Snapshots de candidatos"
+
+    def __str__(self):
+        return self.digest
+
+
 class JobApplications(BaseModel):
     candidate = models.ForeignKey(
         Candidate,
@@ -167,11 +237,13 @@ class JobApplications(BaseModel):
         blank=True,
         choices=StatusInterviewChoices.choices,
     )
-    candidate_snapshot = models.JSONField(
+    snapshot = models.ForeignKey(
+        CandidateSnapshot,
         verbose_name="Datos del candidato al momento de la postulación",
-        blank=True,
+        on_delete=models.PROTECT,
+        related_name="applications",
         null=True,
-        encoder=DjangoJSONEncoder,
+        blank=True,
         editable=False,
     )
 
@@ -179,63 +251,51 @@ class JobApplications(BaseModel):
         verbose_name="Información del usuario almacenada",
         default=False,
     )
+    latest_analysis = models.ForeignKey(
+        "ApplicationsAiAnalysis",
+        verbose_name="Último análisis",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Postulacion"
         verbose_name_plural = "Postulaciones"
         ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="job_applications_keyset_idx"
+            ),
+        ]
+
+    @classmethod
+    def refresh_latest_analysis(cls, queryset=None):
+        """
+        Apunta `latest_analysis` al análisis más reciente de cada postulación
+        con un solo UPDATE. Retorna el número de filas actualizadas.
+        """
+        latest = (
+            ApplicationsAiAnalysis.objects.filter(jobApplications=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("id")[:1]
+        )
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.update(latest_analysis=Subquery(latest))
+
+    @property
+    def candidate_snapshot(self):
+        """Datos del snapshot (leídos de caché por su huella)."""
+        return get_snapshot_data(self.snapshot_id) if self.snapshot_id else None
 
     def save(self, *args, **kwargs):
-        if not self.candidate_snapshot:
-            candidate = self.candidate
-            snapshot = {
-                "name": candidate.name,
-                "email": candidate.user.email if candidate.user else None,
-                "document_type": candidate.document_type,
-                "document_number": candidate.document_number,
-                "country": candidate.country,
-                "photograph": (
-                    candidate.photograph.url if candidate.photograph else None
-                ),
-                "gender": candidate.gender,
-                "birth_date": str(candidate.birth_date),
-                "education_level": candidate.education_level,
-                "location": candidate.location,
-                "short_bio": candidate.short_bio,
-                "cv_file": candidate.cv_file.url if candidate.cv_file else None,
-                "linkedin_url": candidate.linkedin_url,
-                "portfolio_url": candidate.portfolio_url,
-                "has_recommendation": candidate.has_recommendation,
-                "availability": candidate.availability,
-                "skills": [
-                    {"skill": s.skill.name, "proficiency_level": s.proficiency_level}
-                    for s in candidate.skills.all()
-                ],
-                "experiences": [
-                    {
-                        "company_name": e.company_name,
-                        "position": e.position,
-                        "start_date": str(e.start_date) if e.start_date else None,
-                        "end_date": str(e.end_date) if e.end_date else None,
-                        "description": e.description,
-                    }
-                    for e in candidate.experiences.all()
-                ],
-                "educations": [
-                    {
-                        "institution": edu.institution,
-                        "degree": edu.degree,
-                        "field_of_study": edu.field_of_study,
-                        "start_date": str(edu.start_date) if edu.start_date else None,
-                        "end_date": str(edu.end_date) if edu.end_date else None,
-                        "is_study": edu.is_study,
-                        "description": edu.description,
-                    }
-                    for edu in candidate.educations.all()
-                ],
-            }
-            self.candidate_snapshot = snapshot
-            self.has_snapshot = True
+        if not self.snapshot_id:
+            self.snapshot_id = store_snapshots(
+                build_snapshots([self.candidate_id])
+            ).get(self.candidate_id)
+            self.has_snapshot = self.snapshot_id is not None
 
         super().save(*args, **kwargs)
 
@@ -249,6 +309,14 @@ class TimeMetrics(models.Model):
         null=True,
         blank=True,
     )
+    job_offer = models.ForeignKey(
+        JobOffers,
+        on_delete=models.CASCADE,
+        related_name="time_metrics",
+        verbose_name="Oferta laboral",
+        null=True,
+        blank=True,
+    )
     request_id = models.CharField(
         "Identificador de la ejecución", max_length=64, unique=True, db_index=True
     )
@@ -270,6 +338,12 @@ class TimeMetrics(models.Model):
         null=True,
         blank=True,
     )
+    stage_timings = models.JSONField(
+        "Duración por etapa (s)",
+        help_text="Objeto {query, encode, network, persist}",
+        null=True,
+        blank=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -351,6 +425,13 @@ class ApplicationsAiAnalysis(BaseModel):
         null=True,
         blank=True,
     )
+    fingerprint = models.CharField(
+        verbose_name="Huella del contenido evaluado",
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "Análisis de Postulación"
@@ -386,7 +467,7 @@ class EvaluationSummary(models.Model):
 
 class AccuracyMetrics(models.Model):
     interview_date = models.DateField(
-        verbose_name="Fecha de evaluación", default=timezone.now, db_index=True
+        verbose_name="Fecha de evaluación", default=timezone.now, unique=True
     )
 
     job_applications = models.ManyToManyField(
@@ -411,6 +492,18 @@ class AccuracyMetrics(models.Model):
         null=True,
         blank=True,
     )
+    average_score = models.DecimalField(
+        verbose_name="Puntaje promedio",
+        max_digits=6,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+
+    # Marcada cuando cambian las postulaciones de la fecha; se limpia al recalcular
+    is_dirty = models.BooleanField(
+        verbose_name="Pendiente de recalcular", default=False, db_index=True
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -423,6 +516,14 @@ class AccuracyMetrics(models.Model):
     def __str__(self):
         return f"{self.interview_date} - Exactitud: {self.selection_accuracy or 0}%"
 
+    @staticmethod
+    def compute_accuracy(total_selected, total_passed_ef):
+        if total_selected == 0 and total_passed_ef == 0:
+            return 100.0
+        elif total_selected > 0:
+            return round((total_passed_ef / total_selected) * 100, 3)
+        return 0
+
     def calculate_metrics(self):
 
         apps = self.job_applications.all()
@@ -445,14 +546,139 @@ class AccuracyMetrics(models.Model):
             .get("avg")
         )
         self.average_score = avg_score or 0
-        
-        if self.total_cvs_selected == 0 and self.total_cvs_passed_ef == 0:
-            self.selection_accuracy = 100.0
-        elif self.total_cvs_selected > 0:
-            self.selection_accuracy = round(
-                (self.total_cvs_passed_ef / self.total_cvs_selected) * 100, 3
-            )
-        else:
-            self.selection_accuracy = 0
+
+        self.selection_accuracy = self.compute_accuracy(
+            self.total_cvs_selected, self.total_cvs_passed_ef
+        )
         self.save()
         return self.selection_accuracy
+
+
+class EvaluationJob(BaseModel):
+    job_offer = models.ForeignKey(
+        JobOffers,
+        verbose_name="Oferta laboral",
+        on_delete=models.CASCADE,
+        related_name="evaluation_jobs",
+    )
+    status = models.CharField(
+        verbose_name="Estado",
+        max_length=20,
+        choices=EvaluationJobStatusChoices.choices,
+        default=EvaluationJobStatusChoices.QUEUED,
+        db_index=True,
+    )
+    incremental = models.BooleanField(
+        verbose_name="¿Solo postulaciones nuevas o modificadas?", default=False
+    )
+    attempts = models.PositiveIntegerField(verbose_name="Intentos", default=0)
+    worker = models.CharField(
+        verbose_name="Worker", max_length=100, null=True, blank=True
+    )
+    started_at = models.DateTimeField(
+        verbose_name="Inicio de la evaluación", null=True, blank=True
+    )
+    finished_at = models.DateTimeField(
+        verbose_name="Fin de la evaluación", null=True, blank=True
+    )
+    total_count = models.PositiveIntegerField(
+        verbose_name="Postulaciones a evaluar", default=0
+    )
+    evaluated_count = models.PositiveIntegerField(
+        verbose_name="Postulaciones evaluadas", default=0
+    )
+    error = models.TextField(verbose_name="Error", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Evaluación en cola"
+        verbose_name_plural = "Evaluaciones en cola"
+        ordering = ("-created_at",)
+
+    def __str__(self):
+        return f"{self.job_offer} ({self.get_status_display()})"
+
+    @classmethod
+    def claim_next(cls, worker):
+        """
+        Toma el siguiente trabajo en cola y lo marca como en proceso.
+        `skip_locked` permite que varios workers consulten la cola a la vez
+        sin tomar el mismo trabajo. También retoma los trabajos en proceso
+        cuyo worker dejó de renovar `updated_at` (se cayó o lo mataron).
+        """
+        expired = timezone.now() - timedelta(seconds=settings.EVALUATION_JOB_LEASE)
+        with transaction.atomic():
+            job = (
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=EvaluationJobStatusChoices.QUEUED)
+                    | Q(
+                        status=EvaluationJobStatusChoices.RUNNING,
+                        updated_at__lt=expired,
+                    )
+                )
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+
+            job.status = EvaluationJobStatusChoices.RUNNING
+            job.worker = worker
+            job.attempts += 1
+            job.started_at = timezone.now()
+            job.finished_at = None
+            job.error = None
+            job.total_count = 0
+            job.evaluated_count = 0
+            job.save(
+                update_fields=[
+                    "status",
+                    "worker",
+                    "attempts",
+                    "started_at",
+                    "finished_at",
+                    "error",
+                    "total_count",
+                    "evaluated_count",
+                    "updated_at",
+                ]
+            )
+            return job
+
+    @property
+    def is_finished(self):
+        return self.status in (
+            EvaluationJobStatusChoices.DONE,
+            EvaluationJobStatusChoices.FAILED,
+        )
+
+    def heartbeat(self):
+        """Renueva la concesión del trabajo mientras el worker sigue vivo."""
+        return EvaluationJob.objects.filter(
+            pk=self.pk, status=EvaluationJobStatusChoices.RUNNING, worker=self.worker
+        ).update(updated_at=timezone.now())
+
+    def set_total(self, total_count):
+        self.total_count = total_count
+        self.save(update_fields=["total_count", "updated_at"])
+
+    def add_progress(self, count):
+        """Suma candidatos evaluados a medida que se guarda cada lote."""
+        EvaluationJob.objects.filter(pk=self.pk).update(
+            evaluated_count=F("evaluated_count") + count, updated_at=timezone.now()
+        )
+        self.evaluated_count += count
+
+    def mark_done(self, evaluated_count):
+        self.status = EvaluationJobStatusChoices.DONE
+        self.evaluated_count = evaluated_count
+        self.finished_at = timezone.now()
+        self.save(
+            update_fields=["status", "evaluated_count", "finished_at", "updated_at"]
+        )
+
+    def mark_failed(self, error):
+        self.status = EvaluationJobStatusChoices.FAILED
+        self.error = str(error)
+        self.finished_at = timezone.now()
+        self.save(update_fields=["status", "error", "finished_at", "updated_at"])
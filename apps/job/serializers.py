@@ -94,11 +94,13 @@ class JobOffersNestedSerializer(serializers.ModelSerializer):
 class AplicationsAiAnalysisSerializer(serializers.ModelSerializer):
     class Meta:
         model = ApplicationsAiAnalysis
-        fields = '__all__'
+        # La huella es interna (evaluación incremental), no se expone
+        exclude = ['fingerprint']
 
 class JobApplicationsFullSerializer(serializers.ModelSerializer):
     joboffers = JobOffersNestedSerializer(read_only=True)
     analysis = AplicationsAiAnalysisSerializer(many=True, read_only=True)
+    latest_analysis = AplicationsAiAnalysisSerializer(read_only=True)
 
     class Meta:
         model = JobApplications
@@ -108,12 +110,5 @@ class JobApplicationsFullSerializer(serializers.ModelSerializer):
             "created_at",
             "joboffers",
             "analysis",
-        ]
-        
-    def get_analysis(self, obj):
-        last_analysis = obj.analysis.order_by("-created_at").first()
-        return (
-            AplicationsAiAnalysisSerializer(last_analysis).data
-            if last_analysis
-            else None
-        )
\ No newline at end of file
+            "latest_analysis",
+        ]
\ No newline at end of file
@@ -1,26 +1,86 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.db.models.functions import TruncDate
+from django.utils import timezone
 
-from apps.job.models import AccuracyMetrics, JobApplications
+from apps.base.cache import bump_cache_version
+from apps.job.models import (
+    ApplicationsAiAnalysis,
+    JobApplications,
+    JobBenefits,
+    JobOffers,
+    JobPositions,
+    JobRequirements,
+    JobSkill,
+)
+from apps.job.utils.cache import JOB_OFFERS_CACHE, SKILL_INDEX_CACHE
+from apps.job.utils.metrics import mark_accuracy_dirty
+from apps.maintenance.models import Company, Skill
 
 
 @receiver(post_save, sender=JobApplications)
-def update_accuracy_on_status_change(sender, instance, **kwargs):
-
+@receiver(post_delete, sender=JobApplications)
+def mark_accuracy_on_change(sender, instance, **kwargs):
+    # Solo se marca la fecha; el recálculo lo hace `flush_accuracy_metrics`
+    # (o se agenda al confirmar la transacción, según la configuración).
     if not instance.created_at:
         return
-    
-    post_date = instance.created_at.date()
 
-    apps_same_date = JobApplications.objects.filter(
-        created_at__date=post_date
+    mark_accuracy_dirty([timezone.localdate(instance.created_at)])
+
+
+@receiver(post_save, sender=ApplicationsAiAnalysis)
+def set_latest_analysis(sender, instance, created, **kwargs):
+    # La carga masiva de resultados (bulk_create) lo asigna por su cuenta
+    if created:
+        JobApplications.objects.filter(pk=instance.jobApplications_id).update(
+            latest_analysis=instance
+        )
+
+
+@receiver(post_delete, sender=ApplicationsAiAnalysis)
+def reset_latest_analysis(sender, instance, **kwargs):
+    # SET_NULL ya limpió la referencia; se apunta al análisis anterior
+    JobApplications.refresh_latest_analysis(
+        JobApplications.objects.filter(
+            pk=instance.jobApplications_id, latest_analysis__isnull=True
+        )
     )
 
-    if not apps_same_date.exists():
-        return
 
-    metric, _ = AccuracyMetrics.objects.get_or_create(interview_date=post_date)
-    metric.job_applications.set(apps_same_date)
-    metric.calculate_metrics()
+# El listado de ofertas muestra también la empresa y el nombre de cada skill
+JOB_OFFERS_MODELS = (JobOffers, JobSkill, JobRequirements, JobBenefits, Company, Skill)
+
+
+def invalidate_job_offers(sender, **kwargs):
+    bump_cache_version(JOB_OFFERS_CACHE)
+
+
+for model in JOB_OFFERS_MODELS:
+    post_save.connect(invalidate_job_offers, sender=model)
+    post_delete.connect(invalidate_job_offers, sender=model)
+
+
+# El índice de recomendaciones cambia con las skills de cada oferta y al
+# activar o desactivar una oferta (el vencimiento se evalúa al consultar)
+def invalidate_skill_index(sender, **kwargs):
+    bump_cache_version(SKILL_INDEX_CACHE)
+
+
+for model in (JobOffers, JobSkill):
+    post_save.connect(invalidate_skill_index, sender=model)
+    post_delete.connect(invalidate_skill_index, sender=model)
+
+
+@receiver(post_save, sender=JobOffers)
+def update_offer_search_vector(sender, instance, **kwargs):
+    JobOffers.update_search_vector(JobOffers.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=JobPositions)
+def update_position_search_vector(sender, instance, **kwargs):
+    JobOffers.update_search_vector(JobOffers.objects.filter(job_position=instance))
+
 
+@receiver(post_save, sender=Company)
+def update_company_search_vector(sender, instance, **kwargs):
+    JobOffers.update_search_vector(JobOffers.objects.filter(company=instance))
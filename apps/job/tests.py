@@ -1,3 +1,670 @@
-from django.test import TestCase
+import datetime
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.candidate.models import (
+    Candidate,
+    CandidateSkill,
+    Certificates,
+    Education,
+    Experience,
+)
+from apps.job.models import (
+    AccuracyMetrics,
+    ApplicationsAiAnalysis,
+    JobApplications,
+    JobOffers,
+    JobPositions,
+    JobSkill,
+    TimeMetrics,
+)
+from apps.job.utils import evaluator
+from apps.job.utils.evaluation import (
+    evaluate_offer,
+    merge_selection_summaries,
+    send_in_chunks,
+    upload_unknown_cvs,
+)
+from apps.job.utils.fake_evaluator import FakeEvaluator
+from apps.job.utils.metrics import flush_accuracy_metrics
+from apps.job.utils.payload import OfferPayloadBuilder
+from apps.job.utils.recommendations import MAX_PROFICIENCY, SkillIndex
+from apps.job.utils.search import OfferSearch
+from apps.job.utils.timing import StageTimer
+from apps.maintenance.models import Company, Skill
+
+
+class OfferPayloadBuilderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(
+            name="Empresa",
+            legal_name="Empresa SAC",
+            tax_id="20123456789",
+            industry="Software",
+            address="Lima",
+            phone="999999999",
+            email="empresa@example.com",
+            size="Mediana",
+        )
+        cls.position = JobPositions.objects.create(
+            name="Backend", description="Desarrollador backend"
+        )
+        cls.skills = [
+            Skill.objects.create(name="Python", category="Técnica"),
+            Skill.objects.create(name="Inglés", category="Idioma"),
+            Skill.objects.create(name="Excel", category="Ofimática"),
+        ]
+
+    def create_offer(self, applicants):
+        offer = JobOffers.objects.create(
+            title=f"Oferta {applicants}",
+            description="Descripción",
+            job_position=self.position,
+            company=self.company,
+            is_active=True,
+        )
+        candidates = Candidate.objects.bulk_create(
+            Candidate(name=f"Candidato {i}", document_number=str(i))
+            for i in range(applicants)
+        )
+        CandidateSkill.objects.bulk_create(
+            CandidateSkill(candidate=candidate, skill=skill, proficiency_level=2)
+            for candidate in candidates
+            for skill in self.skills
+        )
+        Experience.objects.bulk_create(
+            Experience(candidate=candidate, company_name="ACME", position="Dev")
+            for candidate in candidates
+        )
+        Education.objects.bulk_create(
+            Education(candidate=candidate, institution="UNI", degree="Bachiller")
+            for candidate in candidates
+        )
+        Certificates.objects.bulk_create(
+            Certificates(candidate=candidate, name="AWS", institution="Amazon")
+            for candidate in candidates
+        )
+        JobApplications.objects.bulk_create(
+            JobApplications(candidate=candidate, joboffers=offer)
+            for candidate in candidates
+        )
+        return JobOffers.objects.get(pk=offer.pk)
+
+    def count_build_queries(self, offer):
+        with CaptureQueriesContext(connection) as queries:
+            payload, errors = OfferPayloadBuilder(offer).build()
+        return len(queries), payload, errors
+
+    def test_query_count_is_constant(self):
+        small, payload, errors = self.count_build_queries(self.create_offer(10))
+        large, _, _ = self.count_build_queries(self.create_offer(1000))
+
+        self.assertEqual(small, large)
+        self.assertEqual(errors, [])
+        candidate = payload["candidates"][0]
+        self.assertEqual(candidate["certifications_count"], 1)
+        self.assertEqual(candidate["university_name"], "UNI")
+        self.assertEqual(candidate["experience"], ["Dev en ACME"])
+        self.assertEqual(len(candidate["skills"]), 1)
+        self.assertEqual(len(candidate["languages"]), 1)
+        self.assertEqual(len(candidate["ofimatic"]), 1)
+
+
+class CvDigestProtocolTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.evaluator = FakeEvaluator().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.evaluator.stop()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            BACKIA=self.evaluator.url,
+            BACKIA_CV_BY_DIGEST=True,
+            BACKIA_CHUNK_SIZE=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.evaluator.cvs.clear()
+        self.evaluator.requests.clear()
+
+        company = Company.objects.create(
+            name="Empresa",
+            legal_name="Empresa SAC",
+            tax_id="20123456789",
+            industry="Software",
+            address="Lima",
+            phone="999999999",
+            email="empresa@example.com",
+            size="Mediana",
+        )
+        position = JobPositions.objects.create(name="Backend", description="Dev")
+        self.offer = JobOffers.objects.create(
+            title="Backend",
+            description="Descripción",
+            job_position=position,
+            company=company,
+            is_active=True,
+        )
+        self.candidate = Candidate.objects.create(
+            name="Ana",
+            document_number="1",
+            cv_file=SimpleUploadedFile("cv.pdf", b"%PDF-1.4 cv de prueba"),
+        )
+        JobApplications.objects.create(candidate=self.candidate, joboffers=self.offer)
+
+    def test_digest_is_computed_on_upload(self):
+        self.assertEqual(len(self.candidate.cv_sha256), 64)
+
+    def test_legacy_cv_is_not_hashed_while_building_the_payload(self):
+        Candidate.objects.filter(pk=self.candidate.pk).update(cv_sha256=None)
+
+        with CaptureQueriesContext(connection) as queries:
+            payload, _ = OfferPayloadBuilder(self.offer).build()
+
+        self.assertIsNone(payload["candidates"][0]["cv_sha256"])
+        self.assertFalse(
+            any(q["sql"].startswith("UPDATE") for q in queries.captured_queries)
+        )
+
+        call_command("backfill_cv_sha256", stdout=StringIO())
+        self.candidate.refresh_from_db()
+        self.assertEqual(len(self.candidate.cv_sha256), 64)
+
+    def test_cv_is_uploaded_only_once(self):
+        evaluate_offer(self.offer)
+        evaluate_offer(self.offer)
+
+        self.assertEqual(self.evaluator.count("/api/cvs/lookup"), 2)
+        self.assertEqual(
+            self.evaluator.count(f"/api/cvs/{self.candidate.cv_sha256}"), 1
+        )
+        self.assertEqual(self.evaluator.count("/api/evaluate"), 2)
+        self.assertEqual(ApplicationsAiAnalysis.objects.count(), 2)
+
+    def test_cv_evicted_after_lookup_is_uploaded_again(self):
+        def lookup_then_evict(payload, client=None):
+            uploaded = upload_unknown_cvs(payload, client)
+            # El evaluador olvida el CV entre la consulta y la evaluación
+            self.evaluator.cvs.clear()
+            return uploaded
+
+        with mock.patch(
+            "apps.job.utils.evaluation.upload_unknown_cvs", lookup_then_evict
+        ):
+            evaluate_offer(self.offer)
+
+        self.assertEqual(
+            self.evaluator.count(f"/api/cvs/{self.candidate.cv_sha256}"), 2
+        )
+        self.assertEqual(self.evaluator.count("/api/evaluate"), 2)
+        self.assertEqual(ApplicationsAiAnalysis.objects.count(), 1)
+
+
+class EvaluationTimeoutTests(TestCase):
+    def setUp(self):
+        evaluator._latency.update(value=None, expires=0)
+        self.addCleanup(evaluator._latency.update, value=None, expires=0)
+
+    def test_latency_sample_uses_time_per_cv_reported_by_evaluator(self):
+        # 100 CVs en 4 lotes paralelos: la ejecución dura lo que un lote
+        TimeMetrics.objects.create(
+            request_id="paralelo",
+            candidate_count=100,
+            processing_time_seconds=12.5,
+            processing_time_per_candidate=0.125,
+            candidate_processing_times=[
+                {"id": str(i), "processing_time_seconds": 0.5} for i in range(100)
+            ],
+        )
+        # Ejecución fallida: no aporta muestras
+        TimeMetrics.objects.create(
+            request_id="fallido",
+            candidate_count=0,
+            processing_time_seconds=30,
+            processing_time_per_candidate=0,
+            candidate_processing_times=[],
+        )
+
+        self.assertEqual(evaluator.seconds_per_candidate(), 0.5)
+
+    @override_settings(BACKIA_SECONDS_PER_CANDIDATE=2.0)
+    def test_without_samples_uses_setting(self):
+        self.assertEqual(evaluator.seconds_per_candidate(), 2.0)
+
+
+class AccuracyMetricsFlushTests(TestCase):
+    def test_date_without_applications_is_reset(self):
+        company = Company.objects.create(
+            name="Empresa",
+            legal_name="Empresa SAC",
+            tax_id="20123456789",
+            industry="Software",
+            address="Lima",
+            phone="999999999",
+            email="empresa@example.com",
+            size="Mediana",
+        )
+        offer = JobOffers.objects.create(
+            title="Oferta",
+            description="Descripción",
+            job_position=JobPositions.objects.create(name="Backend"),
+            company=company,
+            is_active=True,
+        )
+        application = JobApplications.objects.create(
+            joboffers=offer, candidate=Candidate.objects.create(name="Candidato")
+        )
+        flush_accuracy_metrics()
+        metric = AccuracyMetrics.objects.get()
+        self.assertEqual(metric.total_cvs, 1)
+
+        application.delete()
+        flush_accuracy_metrics()
+
+        metric.refresh_from_db()
+        self.assertEqual(metric.total_cvs, 0)
+        self.assertFalse(metric.job_applications.exists())
+
+
+class StageTimerTests(SimpleTestCase):
+    def slow_chunks(self):
+        for _ in range(2):
+            time.sleep(0.05)
+            yield b"x"
+
+    def test_nested_stage_is_subtracted_on_the_same_thread(self):
+        timer = StageTimer()
+        with timer.stage("network"):
+            list(timer.iter("encode", self.slow_chunks(), within="network"))
+
+        timings = timer.as_dict()
+        self.assertGreaterEqual(timings["encode"], 0.1)
+        self.assertLess(timings["network"], 0.05)
+
+    def test_time_from_other_threads_is_reported_apart(self):
+        timer = StageTimer()
+
+        def send():
+            list(timer.iter("encode", self.slow_chunks(), within="network"))
+
+        with timer.stage("network"):
+            threads = [threading.Thread(target=send) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        timings = timer.as_dict()
+        self.assertNotIn("encode", timings)
+        self.assertGreaterEqual(timings["encode_threads"], 0.4)
+        self.assertGreaterEqual(timings["network"], 0.1)
+
+
+class FlakyClient:
+    """Cliente que falla `failures[id]` veces los lotes que empiezan con ese id."""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def evaluate(self, payload, timer=None, timeout=None):
+        ids = [c["id"] for c in payload["candidates"]]
+        with self._lock:
+            self.calls.append(ids)
+            if self.failures.get(ids[0], 0) > 0:
+                self.failures[ids[0]] -= 1
+                raise requests.ConnectionError(f"lote {ids[0]} caído")
+        return {
+            "candidates": [{"id": candidate_id} for candidate_id in ids],
+            "selection_summary": [
+                {
+                    "fecha": "2026-01-01",
+                    "criterio": "Edad",
+                    "grupo_protegido": "Mayores de 40",
+                    "grupo_referente": "Menores de 40",
+                    "total_cvs_gp": 0,
+                    "cvs_preseleccionados_gp": 0,
+                    "tasa_seleccion_gp": 0,
+                    "total_cvs_gr": len(ids),
+                    "cvs_preseleccionados_gr": len(ids),
+                    "tasa_seleccion_gr": 1,
+                }
+            ],
+        }
+
+
+@override_settings(BACKIA_SECONDS_PER_CANDIDATE=1)
+class SendInChunksTests(TestCase):
+    def setUp(self):
+        self.payload = {
+            "job_title": "Backend",
+            "candidates": [{"id": str(i)} for i in range(10)],
+        }
+
+    def send(self, client, retries=1):
+        with mock.patch("builtins.print"):
+            return send_in_chunks(
+                self.payload,
+                chunk_size=4,
+                max_workers=2,
+                retries=retries,
+                client=client,
+            )
+
+    def test_results_of_all_chunks_are_merged(self):
+        client = FlakyClient()
+        result, failed = self.send(client)
+
+        self.assertEqual(failed, [])
+        self.assertEqual(sorted(map(len, client.calls)), [2, 4, 4])
+        self.assertEqual(
+            sorted(c["id"] for c in result["candidates"]),
+            sorted(c["id"] for c in self.payload["candidates"]),
+        )
+        [summary] = result["selection_summary"]
+        self.assertEqual(summary["total_cvs_gr"], 10)
+        self.assertEqual(summary["tasa_seleccion_gr"], 1)
+
+    def test_only_failed_chunk_is_retried(self):
+        client = FlakyClient(failures={"4": 1})
+        result, failed = self.send(client)
+
+        self.assertEqual(failed, [])
+        self.assertEqual(len(result["candidates"]), 10)
+        self.assertEqual(sorted(ids[0] for ids in client.calls), ["0", "4", "4", "8"])
+
+    def test_chunk_that_keeps_failing_is_reported(self):
+        client = FlakyClient(failures={"8": 5})
+        result, failed = self.send(client)
+
+        self.assertEqual(len(result["candidates"]), 8)
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0]["candidates"], ["8", "9"])
+        self.assertIn("lote 8 caído", failed[0]["error"])
+
+
+class MergeSelectionSummariesTests(SimpleTestCase):
+    def summary(self, total_gp, rate_gp, total_gr, rate_gr, **extra):
+        return {
+            "fecha": "2026-01-01",
+            "criterio": "Edad",
+            "grupo_protegido": "Mayores de 40",
+            "grupo_referente": "Menores de 40",
+            "total_cvs_gp": total_gp,
+            "cvs_preseleccionados_gp": round(total_gp * rate_gp),
+            "tasa_seleccion_gp": rate_gp,
+            "total_cvs_gr": total_gr,
+            "cvs_preseleccionados_gr": round(total_gr * rate_gr),
+            "tasa_seleccion_gr": rate_gr,
+            **extra,
+        }
+
+    def test_rates_are_weighted_by_chunk_size(self):
+        [merged] = merge_selection_summaries(
+            [self.summary(10, 0.5, 30, 0.2), self.summary(30, 0.1, 10, 0.6)]
+        )
+
+        self.assertEqual(merged["total_cvs_gp"], 40)
+        self.assertEqual(merged["cvs_preseleccionados_gp"], 8)
+        self.assertAlmostEqual(merged["tasa_seleccion_gp"], 0.2)
+        self.assertEqual(merged["total_cvs_gr"], 40)
+        self.assertAlmostEqual(merged["tasa_seleccion_gr"], 0.3)
+        self.assertAlmostEqual(merged["spd"], -0.1)
+
+    def test_each_criterion_is_kept_apart(self):
+        merged = merge_selection_summaries(
+            [self.summary(1, 1, 1, 0), self.summary(2, 0, 2, 1, criterio="Género")]
+        )
+
+        self.assertEqual([item["criterio"] for item in merged], ["Edad", "Género"])
+
+    def test_empty_groups_do_not_divide_by_zero(self):
+        [merged] = merge_selection_summaries([self.summary(0, 0, 0, 0)])
+
+        self.assertEqual(merged["tasa_seleccion_gp"], 0)
+        self.assertEqual(merged["spd"], 0)
+
+
+class IncrementalEvaluationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.evaluator = FakeEvaluator().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.evaluator.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        settings_override = override_settings(
+            BACKIA=self.evaluator.url,
+            BACKIA_CV_BY_DIGEST=False,
+            BACKIA_CHUNK_SIZE=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.evaluator.requests.clear()
+        print_patch = mock.patch("builtins.print")
+        print_patch.start()
+        self.addCleanup(print_patch.stop)
+
+        company = Company.objects.create(
+            name="Empresa",
+            legal_name="Empresa SAC",
+            tax_id="20123456789",
+            industry="Software",
+            address="Lima",
+            phone="999999999",
+            email="empresa@example.com",
+            size="Mediana",
+        )
+        self.offer = JobOffers.objects.create(
+            title="Backend",
+            description="Descripción",
+            job_position=JobPositions.objects.create(name="Backend"),
+            company=company,
+            is_active=True,
+        )
+        self.candidates = [
+            Candidate.objects.create(name=f"Candidato {i}", document_number=str(i))
+            for i in range(3)
+        ]
+        for candidate in self.candidates:
+            JobApplications.objects.create(candidate=candidate, joboffers=self.offer)
+
+    def test_unchanged_candidates_are_not_sent_again(self):
+        self.assertEqual(evaluate_offer(self.offer), 3)
+
+        self.assertEqual(evaluate_offer(self.offer, incremental=True), 0)
+
+        self.assertEqual(self.evaluator.count("/api/evaluate"), 1)
+        self.assertEqual(ApplicationsAiAnalysis.objects.count(), 3)
+
+    def test_only_changed_candidates_are_sent(self):
+        evaluate_offer(self.offer)
+        changed = self.candidates[1]
+        changed.short_bio = "Nueva experiencia en Django"
+        changed.save()
+
+        self.assertEqual(evaluate_offer(self.offer, incremental=True), 1)
+
+        self.assertEqual(self.evaluator.count("/api/evaluate"), 2)
+        self.assertEqual(
+            ApplicationsAiAnalysis.objects.filter(
+                jobApplications__candidate=changed
+            ).count(),
+            2,
+        )
+
+    def test_full_evaluation_ignores_fingerprints(self):
+        evaluate_offer(self.offer)
+
+        self.assertEqual(evaluate_offer(self.offer), 3)
+        self.assertEqual(ApplicationsAiAnalysis.objects.count(), 6)
+
+
+class OfferSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company = Company.objects.create(
+            name="Empresa",
+            legal_name="Empresa SAC",
+            tax_id="20123456789",
+            industry="Software",
+            address="Lima",
+            phone="999999999",
+            email="empresa@example.com",
+            size="Mediana",
+        )
+        position = JobPositions.objects.create(name="Analista")
+        python = Skill.objects.create(name="Python", category="Técnica")
+        excel = Skill.objects.create(name="Excel", category="Ofimática")
+
+        def offer(title, description, mode, employment_type, skills, **extra):
+            job_offer = JobOffers.objects.create(
+                title=title,
+                description=description,
+                job_position=position,
+                company=company,
+                mode=mode,
+                employment_type=employment_type,
+                is_active=True,
+                **extra,
+            )
+            for skill in skills:
+                JobSkill.objects.create(jobOffers=job_offer, skill=skill)
+            return job_offer
+
+        cls.backend = offer(
+            "Desarrollador Python",
+            "Servicios web",
+            "Remoto",
+            "Full-Time",
+            [python],
+            salary_min=4000,
+        )
+        cls.data = offer(
+            "Analista de datos",
+            "Trabajo con desarrolladores y reportes",
+            "Presencial",
+            "Full-Time",
+            [python, excel],
+            salary_min=2000,
+        )
+        cls.support = offer(
+            "Soporte", "Atención a usuarios", "Remoto", "Part-Time", [excel]
+        )
+
+    def facet(self, facets, name):
+        return {item["value"]: item["count"] for item in facets[name]}
+
+    def test_text_search_uses_stemming_and_ranks_title_first(self):
+        search = OfferSearch({"q": "desarrolladores"})
+
+        results = list(search.queryset().order_by("-rank"))
+
+        self.assertEqual(results, [self.backend, self.data])
+
+    def test_filters_are_combined(self):
+        search = OfferSearch({"mode": "Remoto", "skill": "Python"})
+
+        self.assertEqual(list(search.queryset()), [self.backend])
+
+    def test_facets_ignore_their_own_filter(self):
+        facets = OfferSearch({"mode": "Remoto"}).facets()
+
+        # El conteo de modalidad no aplica el filtro de modalidad...
+        self.assertEqual(
+            self.facet(facets, "mode"), {"Remoto": 2, "Presencial": 1, "Híbrido": 0}
+        )
+        # ...pero el resto sí
+        self.assertEqual(
+            self.facet(facets, "employment_type"), {"Part-Time": 1, "Full-Time": 1}
+        )
+        self.assertEqual(self.facet(facets, "skill"), {"Python": 1, "Excel": 1})
+
+    def test_salary_facet_buckets_by_minimum_salary(self):
+        facets = OfferSearch({}).facets()
+
+        self.assertEqual(
+            self.facet(facets, "salary"),
+            {"0-1500": 0, "1500-3000": 1, "3000-5000": 1, "5000+": 0},
+        )
+
+
+class SkillIndexTests(SimpleTestCase):
+    today = datetime.date(2026, 1, 15)
+
+    def index(self, *rows):
+        return SkillIndex(rows)
+
+    def test_rare_skill_outweighs_common_skill(self):
+        # La skill 1 la piden las tres ofertas; la skill 2, solo la oferta 20
+        index = self.index(
+            (1, 10, None),
+            (3, 10, None),
+            (1, 20, None),
+            (2, 20, None),
+            (1, 30, None),
+            (4, 30, None),
+        )
+
+        ranking = index.rank({1: MAX_PROFICIENCY, 2: MAX_PROFICIENCY}, today=self.today)
+
+        best, *rest = ranking
+        self.assertEqual(best[0], 20)
+        self.assertEqual(best[1], 1.0)
+        self.assertEqual(sorted(best[2]), [1, 2])
+        # Las demás solo coinciden en la skill común y pesan bastante menos
+        self.assertEqual({offer_id for offer_id, _, _ in rest}, {10, 30})
+        self.assertTrue(all(score < 0.5 for _, score, _ in rest))
+
+    def test_score_scales_with_proficiency(self):
+        index = self.index((1, 10, None))
+
+        full = index.rank({1: MAX_PROFICIENCY}, today=self.today)
+        partial = index.rank({1: 1}, today=self.today)
+
+        self.assertEqual(full[0][1], 1.0)
+        self.assertEqual(partial[0][1], round(1 / MAX_PROFICIENCY, 4))
+
+    def test_expired_offers_are_skipped(self):
+        index = self.index(
+            (1, 10, self.today - datetime.timedelta(days=1)),
+            (1, 20, self.today),
+            (1, 30, None),
+        )
+
+        ranking = index.rank({1: MAX_PROFICIENCY}, today=self.today)
+
+        self.assertEqual(sorted(offer_id for offer_id, _, _ in ranking), [20, 30])
+
+    def test_unknown_skills_and_limit(self):
+        index = self.index(*[(1, offer_id, None) for offer_id in range(5)])
+
+        self.assertEqual(index.rank({99: MAX_PROFICIENCY}, today=self.today), [])
+        self.assertEqual(
+            len(index.rank({1: MAX_PROFICIENCY}, limit=2, today=self.today)), 2
+        )
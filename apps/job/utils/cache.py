@@ -0,0 +1,30 @@
+from apps.base.cache import queryset_fingerprint
+from apps.job.models import JobBenefits, JobOffers, JobRequirements, JobSkill
+from apps.maintenance.models import Company, Skill
+
+JOB_OFFERS_CACHE = "joboffers"
+SKILL_INDEX_CACHE = "skillindex"
+
+
+def job_offers_fingerprint():
+    """
+    Huella de las ofertas activas y de todo lo que muestra el listado: sus
+    skills, requisitos y beneficios, y los nombres de la empresa y de cada
+    skill.
+    """
+    return queryset_fingerprint(
+        JobOffers.objects.filter(is_active=True),
+        JobSkill.objects.filter(jobOffers__is_active=True),
+        JobRequirements.objects.filter(jobOffers__is_active=True),
+        JobBenefits.objects.filter(jobOffers__is_active=True),
+        Company.objects.filter(company_joboffers__is_active=True),
+        Skill.objects.filter(jobskill__jobOffers__is_active=True),
+    )
+
+
+def skill_index_fingerprint():
+    """Huella de las ofertas activas y de sus skills (lo que usa el índice)."""
+    return queryset_fingerprint(
+        JobOffers.objects.filter(is_active=True),
+        JobSkill.objects.filter(jobOffers__is_active=True),
+    )
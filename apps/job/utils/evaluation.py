@@ -0,0 +1,582 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.job.choices import ResultChoices
+from apps.job.models import (
+    ApplicationsAiAnalysis,
+    EvaluationSummary,
+    JobApplications,
+    TimeMetrics,
+)
+from apps.job.utils.evaluator import evaluation_timeout, get_client
+from apps.job.utils.metrics import recompute_accuracy_metrics
+from apps.job.utils.payload import OfferPayloadBuilder
+from apps.job.utils.prescreening import PrescreeningEngine
+from apps.job.utils.streaming import Base64File
+from apps.job.utils.timing import StageTimer
+from apps.job.utils.utils import decide_status, parse_time_str
+
+BULK_SIZE = 500
+
+
+def _fingerprint_default(value):
+    # El CV se identifica por su nombre, tamaño y fecha de modificación
+    if isinstance(value, Base64File):
+        stat = os.stat(value.path)
+        return {
+            "cv": os.path.basename(value.path),
+            "size": stat.st_size,
+            "mtime": int(stat.st_mtime),
+        }
+    return str(value)
+
+
+def payload_fingerprint(header, candidate):
+    """
+    Huella (SHA-256) del contenido que recibe el evaluador para un candidato:
+    los campos de la oferta más el payload del candidato.
+    """
+    if candidate.get("cv_sha256"):
+        # Con la huella del CV basta; la referencia al archivo no aporta
+        candidate = {k: v for k, v in candidate.items() if k != "cv_pdf_base64"}
+    canonical = json.dumps(
+        {"offer": header, "candidate": candidate},
+        sort_keys=True,
+        default=_fingerprint_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def payload_fingerprints(payload):
+    header = {key: value for key, value in payload.items() if key != "candidates"}
+    return {c["id"]: payload_fingerprint(header, c) for c in payload["candidates"]}
+
+
+def skip_unchanged_candidates(payload, applications, fingerprints):
+    """
+    Quita del payload los candidatos cuyo último análisis tiene la misma huella.
+    Retorna el número de candidatos omitidos.
+    """
+    last_fingerprints = {}
+    for app in applications:
+        analyses = list(app.analysis.all())
+        if analyses:
+            last_fingerprints[str(app.candidate_id)] = analyses[-1].fingerprint
+
+    candidates = [
+        c
+        for c in payload["candidates"]
+        if last_fingerprints.get(c["id"]) != fingerprints[c["id"]]
+    ]
+    skipped = len(payload["candidates"]) - len(candidates)
+    payload["candidates"] = candidates
+    return skipped
+
+
+class EvaluationError(Exception):
+    pass
+
+
+def send_to_evaluator(payload, client=None, timer=None, timeout=None):
+    return (client or get_client()).evaluate(payload, timer, timeout)
+
+
+def upload_unknown_cvs(payload, client=None):
+    """
+    Protocolo por huella: se consulta al evaluador qué CVs (por SHA-256) no
+    conoce, se suben solo esos y los candidatos se envían sin el base64.
+    Si el evaluador no soporta el protocolo, el payload queda como estaba.
+    Retorna el número de CVs subidos.
+    """
+    files = {
+        c["cv_sha256"]: c["cv_pdf_base64"].path
+        for c in payload["candidates"]
+        if c.get("cv_sha256") and isinstance(c.get("cv_pdf_base64"), Base64File)
+    }
+    if not files:
+        return 0
+
+    client = client or get_client()
+    client.cv_files.update(files)
+    unknown = client.lookup_cvs(files)
+    if unknown is None:
+        print("ℹ️ El evaluador no soporta CVs por huella, se envían en base64")
+        return 0
+
+    for digest in unknown:
+        client.upload_cv(digest, files[digest])
+
+    for c in payload["candidates"]:
+        if c.get("cv_sha256") in files:
+            c["cv_pdf_base64"] = None
+
+    return len(unknown)
+
+
+def split_candidates(payload, chunk_size):
+    """Divide el payload en varios payloads con la misma cabecera de oferta."""
+    candidates = payload["candidates"]
+    header = {key: value for key, value in payload.items() if key != "candidates"}
+    return [
+        {**header, "candidates": candidates[i : i + chunk_size]}
+        for i in range(0, len(candidates), chunk_size)
+    ]
+
+
+def merge_selection_summaries(summaries):
+    """
+    Une los `selection_summary` de cada lote. Los totales se suman y las tasas
+    se recalculan ponderando por el total de CVs de cada lote, así se conserva
+    la escala que use el evaluador. El SPD es la diferencia entre ambas tasas.
+    """
+    merged = {}
+    for summary in summaries:
+        key = (
+            summary.get("fecha"),
+            summary.get("criterio"),
+            summary.get("grupo_protegido"),
+            summary.get("grupo_referente"),
+        )
+        item = merged.setdefault(
+            key,
+            {
+                "fecha": summary.get("fecha"),
+                "criterio": summary.get("criterio"),
+                "grupo_protegido": summary.get("grupo_protegido"),
+                "grupo_referente": summary.get("grupo_referente"),
+                "total_cvs_gp": 0,
+                "cvs_preseleccionados_gp": 0,
+                "tasa_seleccion_gp": 0,
+                "total_cvs_gr": 0,
+                "cvs_preseleccionados_gr": 0,
+                "tasa_seleccion_gr": 0,
+            },
+        )
+        for group in ("gp", "gr"):
+            total = summary.get(f"total_cvs_{group}", 0) or 0
+            item[f"tasa_seleccion_{group}"] += (
+                summary.get(f"tasa_seleccion_{group}", 0) or 0
+            ) * total
+            item[f"total_cvs_{group}"] += total
+            item[f"cvs_preseleccionados_{group}"] += (
+                summary.get(f"cvs_preseleccionados_{group}", 0) or 0
+            )
+
+    for item in merged.values():
+        for group in ("gp", "gr"):
+            total = item[f"total_cvs_{group}"]
+            item[f"tasa_seleccion_{group}"] = (
+                item[f"tasa_seleccion_{group}"] / total if total else 0
+            )
+        item["spd"] = item["tasa_seleccion_gp"] - item["tasa_seleccion_gr"]
+
+    return list(merged.values())
+
+
+def send_in_chunks(
+    payload,
+    chunk_size=None,
+    max_workers=None,
+    retries=None,
+    client=None,
+    timer=None,
+    on_result=None,
+):
+    """
+    Envía los candidatos al evaluador en lotes concurrentes (pool acotado de
+    hilos). Solo se reintentan los lotes que fallaron. `on_result` se llama
+    con el resultado de cada lote apenas termina. Retorna el resultado
+    combinado y la lista de lotes que fallaron tras agotar los reintentos.
+    """
+    chunk_size = chunk_size or settings.BACKIA_CHUNK_SIZE
+    max_workers = max_workers or settings.BACKIA_MAX_WORKERS
+    retries = settings.BACKIA_CHUNK_RETRIES if retries is None else retries
+
+    client = client or get_client()
+    # Todos los lotes usan el mismo timeout, calculado aquí y no en cada hilo
+    timeout = evaluation_timeout(chunk_size)
+
+    pending = split_candidates(payload, chunk_size)
+    results = []
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            futures = {
+                executor.submit(send_to_evaluator, chunk, client, timer, timeout): chunk
+                for chunk in pending
+            }
+            pending = []
+            errors = []
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    result = future.result()
+                except requests.RequestException as e:
+                    print(
+                        f"⚠️ Lote de {len(chunk['candidates'])} candidatos falló "
+                        f"(intento {attempt + 1}): {e}"
+                    )
+                    pending.append(chunk)
+                    errors.append(str(e))
+                    continue
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+    merged = {
+        "candidates": [c for result in results for c in result.get("candidates", [])],
+        "selection_summary": merge_selection_summaries(
+            summary
+            for result in results
+            for summary in result.get("selection_summary", [])
+        ),
+    }
+    failed = [
+        {"candidates": [c["id"] for c in chunk["candidates"]], "error": error}
+        for chunk, error in zip(pending, errors)
+    ]
+    return merged, failed
+
+
+def save_evaluation_results(
+    offer, applications, result, fingerprints=None, save_summary=True, status=None
+):
+    """
+    Guarda el análisis de cada candidato y el resumen de selección en una
+    sola transacción, con inserciones y actualizaciones masivas. Como
+    `bulk_update` no dispara `post_save`, las métricas de exactitud se
+    actualizan una sola vez al final de la evaluación. Si se indica
+    `status`, se usa en lugar del que corresponde al puntaje.
+    Retorna las postulaciones actualizadas.
+    """
+    fingerprints = fingerprints or {}
+    selection_summary = result.get("selection_summary", []) if save_summary else []
+
+    apps_by_candidate = {str(app.candidate_id): app for app in applications}
+    analyses = []
+    updated_apps = []
+
+    # === GUARDAR RESULTADOS ===
+    for c in result.get("candidates", []):
+        app = apps_by_candidate.get(c["id"])
+        if app is None:
+            print(f"⚠️ Resultado para un candidato desconocido: {c['id']}")
+            continue
+
+        score = c.get("fairness_overall_score", 0)
+        app_status = status or decide_status(score)
+
+        analyses.append(
+            ApplicationsAiAnalysis(
+                jobApplications=app,
+                job_match_score=c.get("job_match_score"),
+                semantic_score=c.get("semantic_score"),
+                structural_score=c.get("structural_score"),
+                overall_score=score,
+                fairness_structural_score=c.get("fairness_structural_score"),
+                fairness_overall_score=c.get("fairness_overall_score"),
+                fairness_overall_delta=c.get("fairness_overall_delta"),
+                structural_breakdown=c.get("structural_breakdown"),
+                fairness_groups=c.get("fairness_groups"),
+                status=app_status,
+                observation=c.get("decision_label"),
+                processing_start_time=parse_time_str(c.get("processing_start_time")),
+                processing_end_time=parse_time_str(c.get("processing_end_time")),
+                processing_time_minutes=round(
+                    float(c.get("processing_time_seconds", 0)), 2
+                ),
+                fingerprint=fingerprints.get(c["id"]),
+            )
+        )
+        app.status = app_status
+        app.latest_analysis = analyses[-1]
+        updated_apps.append(app)
+
+    with transaction.atomic():
+        ApplicationsAiAnalysis.objects.bulk_create(analyses, batch_size=BULK_SIZE)
+        JobApplications.objects.bulk_update(
+            updated_apps, ["status", "latest_analysis"], batch_size=BULK_SIZE
+        )
+        save_selection_summary(offer, selection_summary)
+
+    return updated_apps
+
+
+def save_selection_summary(offer, selection_summary):
+    # === GUARDAR SELECTION SUMMARY ===
+    summaries = [
+        EvaluationSummary(
+            job_offer=offer,
+            fecha=summary.get("fecha"),
+            criterio=summary.get("criterio"),
+            grupo_protegido=summary.get("grupo_protegido"),
+            total_cvs_gp=summary.get("total_cvs_gp", 0),
+            cvs_preseleccionados_gp=summary.get("cvs_preseleccionados_gp", 0),
+            tasa_seleccion_gp=summary.get("tasa_seleccion_gp", 0),
+            grupo_referente=summary.get("grupo_referente"),
+            total_cvs_gr=summary.get("total_cvs_gr", 0),
+            cvs_preseleccionados_gr=summary.get("cvs_preseleccionados_gr", 0),
+            tasa_seleccion_gr=summary.get("tasa_seleccion_gr", 0),
+            spd=summary.get("spd") or 0,
+        )
+        for summary in selection_summary
+    ]
+    if not summaries:
+        return
+
+    with transaction.atomic():
+        EvaluationSummary.objects.filter(job_offer=offer).delete()
+        EvaluationSummary.objects.bulk_create(summaries)
+
+
+def update_offer_accuracy_metrics(offer):
+    # === GUARDAR MÉTRICAS DE EXACTITUD ===
+    dates = (
+        JobApplications.objects.filter(joboffers=offer)
+        .annotate(post_date=TruncDate("created_at"))
+        .values_list("post_date", flat=True)
+        .distinct()
+    )
+    recompute_accuracy_metrics(dates)
+
+
+def evaluate_offer(offer, incremental=False, job=None):
+    """
+    Ejecuta la evaluación completa de una oferta: arma el payload, lo envía
+    al evaluador y guarda los resultados. Retorna el número de candidatos
+    evaluados. Los errores de red se propagan para que el worker marque el
+    trabajo como fallido.
+
+    En modo incremental solo se envían las postulaciones nuevas o cuyo
+    contenido cambió desde su último análisis; el resto conserva el análisis
+    existente.
+
+    Si se envía por lotes, cada lote se guarda apenas llega y el avance se
+    registra en `job`, para que la página de resultados lo muestre.
+    """
+    timer = StageTimer()
+    started_at = timezone.now()
+
+    with timer.stage("query"):
+        builder = OfferPayloadBuilder(offer)
+        applications = builder.applications
+    with timer.stage("encode"):
+        payload, errors = builder.build()
+        fingerprints = payload_fingerprints(payload)
+
+    skipped = 0
+    if incremental:
+        skipped = skip_unchanged_candidates(payload, applications, fingerprints)
+        print(f"ℹ️ {skipped} candidatos sin cambios se omiten")
+        if not payload["candidates"]:
+            # La ejecución se registra igual, aunque no haya nada que enviar
+            save_time_metrics(offer, {"candidates": []}, timer, started_at)
+            return 0
+
+    # El total incluye a los que se descarten en la preselección local, igual
+    # que el número de evaluados que se registra al terminar
+    if job:
+        job.set_total(len(payload["candidates"]))
+
+    engine = None
+    if settings.PRESCREENING_THRESHOLD or settings.PRESCREENING_FALLBACK:
+        engine = PrescreeningEngine(offer, applications)
+
+    discarded = 0
+    if settings.PRESCREENING_THRESHOLD:
+        with timer.stage("prescreen"):
+            discarded = discard_below_threshold(
+                offer, applications, payload, engine, settings.PRESCREENING_THRESHOLD
+            )
+        print(f"ℹ️ {discarded} candidatos descartados en la preselección local")
+        if job:
+            job.add_progress(discarded)
+
+    def save_chunk(chunk_result):
+        with timer.stage("persist", within="network"):
+            save_evaluation_results(
+                offer, applications, chunk_result, fingerprints, save_summary=False
+            )
+        if job:
+            job.add_progress(len(chunk_result.get("candidates", [])))
+
+    result, failed = {"candidates": [], "selection_summary": []}, []
+    client = get_client()
+    try:
+        with timer.stage("network"):
+            if payload["candidates"] and settings.BACKIA_CV_BY_DIGEST:
+                upload_unknown_cvs(payload, client)
+
+            chunk_size = settings.BACKIA_CHUNK_SIZE
+            if not payload["candidates"]:
+                # Todos quedaron descartados en la preselección local
+                pass
+            elif chunk_size and len(payload["candidates"]) > chunk_size:
+                result, failed = send_in_chunks(
+                    payload, client=client, timer=timer, on_result=save_chunk
+                )
+            else:
+                result = send_to_evaluator(payload, client, timer)
+                save_chunk(result)
+    except requests.RequestException as e:
+        if not settings.PRESCREENING_FALLBACK:
+            raise
+        failed = [
+            {"candidates": [c["id"] for c in payload["candidates"]], "error": str(e)}
+        ]
+
+    if failed and settings.PRESCREENING_FALLBACK:
+        # Modo degradado: quienes no se pudieron evaluar quedan con el
+        # puntaje local y en evaluación, a la espera de reintentar.
+        failed_ids = {
+            candidate_id for chunk in failed for candidate_id in chunk["candidates"]
+        }
+        save_evaluation_results(
+            offer,
+            applications,
+            engine.as_result(
+                [
+                    item
+                    for item in engine.shortlist()
+                    if str(item["application"].candidate_id) in failed_ids
+                ],
+                "Puntaje preliminar local (evaluador no disponible)",
+            ),
+            save_summary=False,
+            status=ResultChoices.EA,
+        )
+
+    with timer.stage("persist"):
+        # El resumen de selección de un subconjunto no representa a toda la
+        # oferta, por eso solo se reemplaza cuando se evaluaron todos.
+        if not (skipped or discarded or failed):
+            save_selection_summary(offer, result.get("selection_summary", []))
+        update_offer_accuracy_metrics(offer)
+
+    save_time_metrics(offer, result, timer, started_at)
+
+    if failed:
+        failed_count = sum(len(chunk["candidates"]) for chunk in failed)
+        raise EvaluationError(
+            f"{failed_count} candidatos no se pudieron evaluar: {failed[0]['error']}"
+        )
+
+    return len(result.get("candidates", [])) + discarded
+
+
+def discard_below_threshold(offer, applications, payload, engine, threshold):
+    """
+    Quita del payload a los candidatos cuyo puntaje local no alcanza
+    `threshold` y les guarda ese puntaje como resultado. Retorna cuántos
+    se descartaron.
+    """
+    pending = {c["id"] for c in payload["candidates"]}
+    items = [
+        item
+        for item in engine.below(threshold)
+        if str(item["application"].candidate_id) in pending
+    ]
+    if not items:
+        return 0
+
+    discarded_ids = {str(item["application"].candidate_id) for item in items}
+    payload["candidates"] = [
+        c for c in payload["candidates"] if c["id"] not in discarded_ids
+    ]
+    save_evaluation_results(
+        offer,
+        applications,
+        engine.as_result(items, "Descartado en la preselección local"),
+        save_summary=False,
+        status=ResultChoices.RC,
+    )
+    return len(items)
+
+
+def save_time_metrics(offer, result, timer, started_at):
+    """
+    Registra la ejecución en `TimeMetrics`: duración por etapa y la duración
+    de cada CV según la respuesta del evaluador.
+    """
+    finished_at = timezone.now()
+    candidates = result.get("candidates", [])
+    total = (finished_at - started_at).total_seconds()
+
+    return TimeMetrics.objects.create(
+        job_offer=offer,
+        request_id=uuid.uuid4().hex,
+        candidate_count=len(candidates),
+        started_at=started_at,
+        finished_at=finished_at,
+        processing_time_seconds=round(total, 4),
+        processing_time_per_candidate=(
+            round(total / len(candidates), 4) if candidates else 0
+        ),
+        candidate_processing_times=[
+            {
+                "id": c.get("id"),
+                "name": c.get("name"),
+                "processing_time_seconds": c.get("processing_time_seconds"),
+            }
+            for c in candidates
+        ],
+        stage_timings=timer.as_dict(),
+    )
+
+
+@contextmanager
+def job_heartbeat(job):
+    """
+    Renueva la concesión del trabajo desde un hilo aparte mientras dura la
+    evaluación, así un envío largo al evaluador no parece abandonado.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.EVALUATION_JOB_HEARTBEAT):
+                job.heartbeat()
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def process_evaluation_job(job):
+    """Ejecuta un `EvaluationJob` ya tomado por un worker y registra su estado."""
+    try:
+        with job_heartbeat(job):
+            evaluated_count = evaluate_offer(
+                job.job_offer, incremental=job.incremental, job=job
+            )
+    except (KeyboardInterrupt, SystemExit):
+        # El worker se detiene (Ctrl-C, deploy): el trabajo no queda en proceso
+        job.mark_failed("El worker se detuvo antes de terminar la evaluación")
+        raise
+    except Exception as e:
+        print(f"❌ Error en la evaluación {job.pk}: {e}")
+        job.mark_failed(e)
+        return job
+
+    job.mark_done(evaluated_count)
+    return job
@@ -0,0 +1,206 @@
+"""
+Cliente HTTP del evaluador (BACKIA). Cada proceso worker mantiene una
+sesión con pool de conexiones keep-alive que comparten sus hilos.
+"""
+
+import os
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from apps.job.models import TimeMetrics
+from apps.job.utils.metrics import percentile
+from apps.job.utils.streaming import iter_payload_json
+
+RETRY_STATUS = {502, 503, 504}
+LATENCY_SAMPLE_RUNS = 20
+LATENCY_CACHE_SECONDS = 300
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+_latency = {"value": None, "expires": 0}
+
+
+def get_session():
+    """Sesión de la cual cuelga el pool; se recrea después de un fork."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=max(settings.BACKIA_MAX_WORKERS, 1) * 2,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def seconds_per_candidate():
+    """
+    Percentil 95 de la duración por CV que reportó el evaluador en las
+    últimas ejecuciones registradas en `TimeMetrics`. Se usa la duración de
+    cada CV y no el total de la ejecución entre candidatos, que con lotes en
+    paralelo queda muy por debajo de lo que tarda una petición. Se guarda
+    unos minutos por proceso.
+    """
+    now = time.monotonic()
+    if _latency["expires"] > now:
+        return _latency["value"]
+
+    runs = (
+        TimeMetrics.objects.filter(candidate_count__gt=0)
+        .exclude(candidate_processing_times=None)
+        .order_by("-created_at")
+        .values_list("candidate_processing_times", flat=True)[:LATENCY_SAMPLE_RUNS]
+    )
+    samples = sorted(
+        float(item["processing_time_seconds"])
+        for times in runs
+        for item in times
+        if (item.get("processing_time_seconds") or 0) > 0
+    )
+    value = percentile(samples, 0.95) or settings.BACKIA_SECONDS_PER_CANDIDATE
+    _latency.update(value=value, expires=now + LATENCY_CACHE_SECONDS)
+    return value
+
+
+def evaluation_timeout(candidate_count):
+    """Timeout (conexión, lectura) según el tamaño del lote y la latencia previa."""
+    read = settings.BACKIA_TIMEOUT_BASE + (
+        seconds_per_candidate() * candidate_count * settings.BACKIA_TIMEOUT_FACTOR
+    )
+    return settings.BACKIA_CONNECT_TIMEOUT, min(read, settings.BACKIA_TIMEOUT_MAX)
+
+
+class EvaluatorClient:
+    def __init__(self, session=None, retries=None, backoff=None):
+        self.session = session or get_session()
+        self.retries = settings.BACKIA_RETRIES if retries is None else retries
+        self.backoff = settings.BACKIA_BACKOFF if backoff is None else backoff
+        # Huella -> ruta de los CVs enviados por huella, para volver a subirlos
+        # si el evaluador los descartó antes de evaluar
+        self.cv_files = {}
+
+    def url(self, path):
+        return f"{settings.BACKIA}{path}"
+
+    def request(self, method, path, idempotent=False, data=None, **kwargs):
+        """
+        Ejecuta la petición. Las idempotentes se reintentan con backoff
+        exponencial ante errores de red o 502/503/504. `data` puede ser una
+        función que arma el cuerpo, para poder regenerarlo en cada intento.
+        """
+        attempts = self.retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            body = data() if callable(data) else data
+            try:
+                response = self.session.request(
+                    method, self.url(path), data=body, **kwargs
+                )
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                error = requests.HTTPError(
+                    f"{response.status_code} en {path}", response=response
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt + 1 < attempts:
+                time.sleep(self.backoff * 2**attempt)
+
+        if isinstance(error, requests.HTTPError):
+            return error.response
+        raise error
+
+    def evaluate(self, payload, timer=None, timeout=None):
+        # El cuerpo se envía como generador (transfer-encoding: chunked), así
+        # nunca se tienen todos los CVs en memoria a la vez.
+        def body():
+            chunks = iter_payload_json(payload)
+            if timer:
+                # Codificar el cuerpo cuenta como "encode", no como red
+                chunks = timer.iter("encode", chunks, within="network")
+            return chunks
+
+        # Quien envía varios lotes en paralelo calcula el timeout una vez
+        # antes de repartirlos, para no consultar la base desde cada hilo
+        timeout = timeout or evaluation_timeout(len(payload["candidates"]))
+
+        for attempt in range(2):
+            response = self.request(
+                "POST",
+                "/api/evaluate",
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
+            # 409: el evaluador no conoce algún CV enviado por huella (lo
+            # descartó después de la consulta); se sube y se reenvía una vez
+            if (
+                response.status_code != 409
+                or attempt
+                or not self.upload_missing_cvs(response)
+            ):
+                break
+        response.raise_for_status()
+        return response.json()
+
+    def upload_missing_cvs(self, response):
+        """
+        Sube los CVs de `unknown_cv_digests` de una respuesta 409. Retorna
+        False si falta alguno que no se puede subir desde aquí.
+        """
+        try:
+            digests = response.json().get("unknown_cv_digests") or []
+        except ValueError:
+            return False
+        if not digests or any(digest not in self.cv_files for digest in digests):
+            return False
+
+        for digest in digests:
+            self.upload_cv(digest, self.cv_files[digest])
+        return True
+
+    def lookup_cvs(self, digests):
+        """
+        Retorna las huellas que el evaluador no conoce, o `None` si el
+        evaluador no soporta el protocolo por huella.
+        """
+        response = self.request(
+            "POST",
+            "/api/cvs/lookup",
+            idempotent=True,
+            json={"digests": list(digests)},
+            timeout=(settings.BACKIA_CONNECT_TIMEOUT, 30),
+        )
+        if response.status_code in (404, 405):
+            return None
+        response.raise_for_status()
+        return response.json().get("unknown", [])
+
+    def upload_cv(self, digest, path):
+        def body():
+            # El archivo se abre en cada intento y se cierra al terminar
+            with open(path, "rb") as f:
+                while block := f.read(256 * 1024):
+                    yield block
+
+        response = self.request(
+            "PUT",
+            f"/api/cvs/{digest}",
+            idempotent=True,
+            data=body,
+            headers={"Content-Type": "application/pdf"},
+            timeout=(settings.BACKIA_CONNECT_TIMEOUT, 120),
+        )
+        response.raise_for_status()
+
+
+def get_client():
+    return EvaluatorClient()
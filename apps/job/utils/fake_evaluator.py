@@ -0,0 +1,200 @@
+"""
+Servidor local que imita la API del evaluador (BACKIA). Se usa en pruebas
+y benchmarks para no depender del servicio real.
+
+    with FakeEvaluator() as evaluator:
+        with override_settings(BACKIA=evaluator.url):
+            ...
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CV_PATH = re.compile(r"^/api/cvs/(?P<digest>[0-9a-f]{64})$")
+
+
+def fake_scores(candidate_id):
+    """Puntajes deterministas a partir del id del candidato."""
+    seed = int(hashlib.sha256(str(candidate_id).encode()).hexdigest()[:8], 16)
+    semantic = 40 + seed % 55
+    structural = 35 + (seed // 97) % 60
+    overall = round(semantic * 0.6 + structural * 0.4, 2)
+    return semantic, structural, overall
+
+
+class FakeEvaluatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def evaluator(self):
+        return self.server.evaluator
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            body = b"".join(parts)
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.evaluator.record(self.path, len(body))
+        return body
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.read_body()
+        if self.path == "/api/evaluate":
+            return self.evaluate(json.loads(body))
+        if self.path == "/api/cvs/lookup":
+            digests = json.loads(body).get("digests", [])
+            unknown = [d for d in digests if d not in self.evaluator.cvs]
+            return self.send_json({"unknown": unknown})
+        self.send_json({"detail": "Not found"}, status=404)
+
+    def do_PUT(self):
+        match = CV_PATH.match(self.path)
+        body = self.read_body()
+        if not match:
+            return self.send_json({"detail": "Not found"}, status=404)
+        digest = match.group("digest")
+        if hashlib.sha256(body).hexdigest() != digest:
+            return self.send_json({"detail": "Digest mismatch"}, status=400)
+        self.evaluator.cvs.add(digest)
+        self.send_json({"sha256": digest}, status=201)
+
+    def evaluate(self, payload):
+        candidates = payload.get("candidates", [])
+        unknown = [
+            c["cv_sha256"]
+            for c in candidates
+            if c.get("cv_sha256")
+            and not c.get("cv_pdf_base64")
+            and c["cv_sha256"] not in self.evaluator.cvs
+        ]
+        if unknown:
+            return self.send_json({"unknown_cv_digests": unknown}, status=409)
+
+        time.sleep(
+            self.evaluator.latency
+            + self.evaluator.per_candidate_latency * len(candidates)
+        )
+
+        start = datetime.now()
+        results = []
+        selected = 0
+        for i, c in enumerate(candidates):
+            semantic, structural, overall = fake_scores(c["id"])
+            selected += overall >= 55
+            began = start + timedelta(seconds=i * self.evaluator.per_candidate_latency)
+            results.append(
+                {
+                    "id": c["id"],
+                    "name": c.get("name"),
+                    "job_match_score": overall,
+                    "semantic_score": semantic,
+                    "structural_score": structural,
+                    "fairness_structural_score": structural,
+                    "fairness_overall_score": overall,
+                    "fairness_overall_delta": 0,
+                    "structural_breakdown": {
+                        "skills": len(c.get("skills") or []),
+                        "experience_years": c.get("experience_years"),
+                        "certifications": c.get("certifications_count"),
+                    },
+                    "fairness_groups": {"age": c.get("age")},
+                    "decision_label": "Recomendado" if overall >= 75 else "Competitivo",
+                    "processing_start_time": began.strftime("%H:%M:%S"),
+                    "processing_end_time": (
+                        began + timedelta(seconds=self.evaluator.per_candidate_latency)
+                    ).strftime("%H:%M:%S"),
+                    "processing_time_seconds": self.evaluator.per_candidate_latency,
+                }
+            )
+
+        total = len(candidates)
+        rate = selected / total if total else 0
+        summary = [
+            {
+                "fecha": start.date().isoformat(),
+                "criterio": "Edad",
+                "grupo_protegido": "Mayores de 40",
+                "total_cvs_gp": 0,
+                "cvs_preseleccionados_gp": 0,
+                "tasa_seleccion_gp": 0,
+                "grupo_referente": "Menores de 40",
+                "total_cvs_gr": total,
+                "cvs_preseleccionados_gr": selected,
+                "tasa_seleccion_gr": rate,
+                "spd": -rate,
+            }
+        ]
+        self.send_json({"candidates": results, "selection_summary": summary})
+
+
+class FakeEvaluator:
+    """
+    Levanta el servidor en un hilo y un puerto libre. `latency` es el retardo
+    fijo por petición y `per_candidate_latency` el retardo por candidato.
+    """
+
+    def __init__(
+        self, latency=0.0, per_candidate_latency=0.0, host="127.0.0.1", port=0
+    ):
+        self.latency = latency
+        self.per_candidate_latency = per_candidate_latency
+        self.cvs = set()
+        self.requests = []
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), FakeEvaluatorHandler)
+        self.server.daemon_threads = True
+        self.server.evaluator = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path, size):
+        with self._lock:
+            self.requests.append(path)
+            self.bytes_received += size
+
+    def count(self, path_prefix):
+        return sum(1 for path in self.requests if path.startswith(path_prefix))
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
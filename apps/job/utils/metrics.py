@@ -0,0 +1,252 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.job.choices import ResultChoices, StatusInterviewChoices
+from apps.job.models import AccuracyMetrics, JobApplications
+
+PASSED_INTERVIEW = [StatusInterviewChoices.PSE, StatusInterviewChoices.CTR]
+
+
+def applications_by_date(dates):
+    return JobApplications.objects.annotate(post_date=TruncDate("created_at")).filter(
+        post_date__in=dates
+    )
+
+
+def recompute_accuracy_metrics(dates):
+    """
+    Recalcula las métricas de exactitud de varias fechas a la vez: los
+    totales salen de una sola consulta agrupada por fecha y las filas de
+    `AccuracyMetrics` se insertan o actualizan en bloque. La relación con
+    las postulaciones solo se toca cuando cambió. Las fechas que ya no
+    tienen postulaciones quedan en cero.
+    """
+    dates = set(dates)
+    if not dates:
+        return []
+
+    rows = (
+        applications_by_date(dates)
+        .values("post_date")
+        .annotate(
+            total=Count("id", distinct=True),
+            selected=Count(
+                "id", filter=Q(analysis__status=ResultChoices.AP), distinct=True
+            ),
+            passed_ef=Count(
+                "id", filter=Q(status_interview__in=PASSED_INTERVIEW), distinct=True
+            ),
+            average_score=Avg("analysis__overall_score"),
+        )
+        .order_by()
+    )
+
+    metrics = [
+        AccuracyMetrics(
+            interview_date=row["post_date"],
+            total_cvs=row["total"],
+            total_cvs_selected=row["selected"],
+            total_cvs_passed_ef=row["passed_ef"],
+            average_score=row["average_score"] or 0,
+            selection_accuracy=AccuracyMetrics.compute_accuracy(
+                row["selected"], row["passed_ef"]
+            ),
+        )
+        for row in rows
+    ]
+    # Fechas que se quedaron sin postulaciones: sus totales vuelven a cero
+    empty = dates - {m.interview_date for m in metrics}
+
+    with transaction.atomic():
+        if metrics:
+            AccuracyMetrics.objects.bulk_create(
+                metrics,
+                update_conflicts=True,
+                unique_fields=["interview_date"],
+                update_fields=[
+                    "total_cvs",
+                    "total_cvs_selected",
+                    "total_cvs_passed_ef",
+                    "average_score",
+                    "selection_accuracy",
+                    "updated_at",
+                ],
+            )
+        if empty:
+            AccuracyMetrics.objects.filter(interview_date__in=empty).update(
+                total_cvs=0,
+                total_cvs_selected=0,
+                total_cvs_passed_ef=0,
+                average_score=0,
+                selection_accuracy=AccuracyMetrics.compute_accuracy(0, 0),
+                updated_at=timezone.now(),
+            )
+        metric_ids = dict(
+            AccuracyMetrics.objects.filter(interview_date__in=dates).values_list(
+                "interview_date", "id"
+            )
+        )
+        sync_metric_applications(metric_ids)
+
+    return metrics
+
+
+# Fechas marcadas en la transacción en curso de cada hilo
+_pending = threading.local()
+
+
+def mark_accuracy_dirty(dates):
+    """
+    Marca las fechas cuyas métricas hay que recalcular. Es un upsert, así
+    que dos procesos que marcan la misma fecha no compiten por crear la
+    fila. El recálculo se agenda una sola vez por transacción.
+    """
+    dates = set(dates)
+    if not dates:
+        return
+
+    AccuracyMetrics.objects.bulk_create(
+        [AccuracyMetrics(interview_date=date, is_dirty=True) for date in dates],
+        update_conflicts=True,
+        unique_fields=["interview_date"],
+        update_fields=["is_dirty"],
+    )
+    if settings.ACCURACY_METRICS_FLUSH_ON_COMMIT:
+        schedule_accuracy_flush(dates)
+
+
+def schedule_accuracy_flush(dates):
+    connection = transaction.get_connection()
+    # Si la transacción se revirtió, Django ya descartó el callback anterior
+    scheduled = any(
+        callback[1] is flush_pending_accuracy for callback in connection.run_on_commit
+    )
+    if not scheduled:
+        _pending.dates = set()
+    _pending.dates.update(dates)
+    if not scheduled:
+        transaction.on_commit(flush_pending_accuracy)
+
+
+def flush_pending_accuracy():
+    dates, _pending.dates = _pending.dates, set()
+    flush_accuracy_metrics(dates)
+
+
+def flush_accuracy_metrics(dates=None):
+    """
+    Recalcula las fechas marcadas (todas, o solo las de `dates`) con una
+    sola llamada a `recompute_accuracy_metrics`. Retorna las fechas
+    recalculadas.
+    """
+    queryset = AccuracyMetrics.objects.filter(is_dirty=True)
+    if dates is not None:
+        queryset = queryset.filter(interview_date__in=dates)
+    dirty = list(queryset.values_list("interview_date", flat=True))
+    if not dirty:
+        return []
+
+    # La marca se limpia antes de recalcular: si otra postulación la vuelve
+    # a marcar mientras tanto, la fecha queda pendiente para el siguiente.
+    AccuracyMetrics.objects.filter(interview_date__in=dirty, is_dirty=True).update(
+        is_dirty=False
+    )
+    recompute_accuracy_metrics(dirty)
+    return dirty
+
+
+def sync_metric_applications(metric_ids):
+    """
+    Deja en `AccuracyMetrics.job_applications` las postulaciones de cada
+    fecha, insertando y borrando solo la diferencia.
+    """
+    Through = AccuracyMetrics.job_applications.through
+
+    expected = {
+        (metric_ids[post_date], app_id)
+        for app_id, post_date in applications_by_date(list(metric_ids)).values_list(
+            "id", "post_date"
+        )
+    }
+    current = {
+        (metric_id, app_id): pk
+        for pk, metric_id, app_id in Through.objects.filter(
+            accuracymetrics_id__in=metric_ids.values()
+        ).values_list("id", "accuracymetrics_id", "jobapplications_id")
+    }
+
+    to_add = expected - current.keys()
+    to_remove = [pk for key, pk in current.items() if key not in expected]
+
+    if to_remove:
+        Through.objects.filter(id__in=to_remove).delete()
+    if to_add:
+        Through.objects.bulk_create(
+            [
+                Through(accuracymetrics_id=metric_id, jobapplications_id=app_id)
+                for metric_id, app_id in to_add
+            ],
+            batch_size=500,
+            # Otro recálculo de la misma fecha pudo insertarlas primero
+            ignore_conflicts=True,
+        )
+
+
+# Rangos de tamaño de oferta (número de CVs) para comparar el rendimiento
+OFFER_SIZE_BUCKETS = [(1, 10), (11, 100), (101, 1000), (1001, None)]
+
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def throughput_by_offer_size(queryset):
+    """
+    p50/p95 del rendimiento (CVs por segundo) y de la duración de cada etapa
+    para las ejecuciones de `TimeMetrics`, agrupadas por tamaño de oferta.
+    """
+    rows = queryset.filter(candidate_count__gt=0, processing_time_seconds__gt=0)
+    stats = []
+    for low, high in OFFER_SIZE_BUCKETS:
+        bucket = rows.filter(candidate_count__gte=low)
+        if high:
+            bucket = bucket.filter(candidate_count__lte=high)
+        runs = list(
+            bucket.values_list(
+                "candidate_count", "processing_time_seconds", "stage_timings"
+            )
+        )
+        if not runs:
+            continue
+
+        throughput = sorted(count / float(seconds) for count, seconds, _ in runs)
+        stages = {}
+        for _, _, timings in runs:
+            for name, seconds in (timings or {}).items():
+                stages.setdefault(name, []).append(seconds)
+
+        stats.append(
+            {
+                "label": f"{low}–{high}" if high else f"más de {low - 1}",
+                "runs": len(runs),
+                "p50": percentile(throughput, 0.5),
+                "p95": percentile(throughput, 0.95),
+                "stages": [
+                    {
+                        "name": name,
+                        "p50": percentile(sorted(values), 0.5),
+                        "p95": percentile(sorted(values), 0.95),
+                    }
+                    for name, values in stages.items()
+                ],
+            }
+        )
+    return stats
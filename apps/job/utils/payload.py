@@ -0,0 +1,156 @@
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.candidate.models import CandidateSkill, Certificates, Education
+from apps.job.models import JobApplications
+from apps.job.utils.utils import calculate_experience_years, pdf_reference
+
+PROFICIENCY_LABELS = {1: "Básico", 2: "Intermedio", 3: "Avanzado"}
+
+
+class OfferPayloadBuilder:
+    """
+    Arma el payload que espera el evaluador (BACKIA) para una oferta con un
+    número fijo de consultas, sin importar cuántas postulaciones tenga:
+    skills (con su `Skill`), experiencias y análisis se precargan, y el
+    número de certificados y la primera educación se anotan en la consulta
+    de postulaciones. `calculate_experience_years` trabaja sobre las
+    experiencias precargadas.
+    """
+
+    def __init__(self, offer, applications=None):
+        self.offer = offer
+        self._applications = applications
+
+    def get_applications(self):
+        certificates_count = (
+            Certificates.objects.filter(candidate=OuterRef("candidate_id"))
+            .order_by()
+            .values("candidate")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        first_education = Education.objects.filter(
+            candidate=OuterRef("candidate_id")
+        ).order_by("created_at")
+
+        return (
+            JobApplications.objects.filter(joboffers=self.offer)
+            .select_related("candidate")
+            .prefetch_related(
+                Prefetch(
+                    "candidate__skills",
+                    queryset=CandidateSkill.objects.select_related("skill"),
+                ),
+                "candidate__experiences",
+                "analysis",
+            )
+            .annotate(
+                certifications_count=Coalesce(
+                    Subquery(certificates_count, output_field=IntegerField()), 0
+                ),
+                university_name=Subquery(first_education.values("institution")[:1]),
+            )
+        )
+
+    @property
+    def applications(self):
+        if self._applications is None:
+            self._applications = list(self.get_applications())
+        return self._applications
+
+    def build_header(self):
+        offer = self.offer
+        return {
+            "job_title": offer.title,
+            "job_description": offer.description,
+            "job_position": offer.job_position.name if offer.job_position else None,
+            "job_position_description": (
+                offer.job_position.description if offer.job_position else None
+            ),
+            "company": offer.company.name if offer.company else None,
+            "location": offer.location,
+            "start_date": str(offer.start_date) if offer.start_date else None,
+            "end_date": str(offer.end_date) if offer.end_date else None,
+            "is_active": offer.is_active,
+            "employment_type": offer.employment_type,
+            "salary_min": float(offer.salary_min) if offer.salary_min else None,
+            "salary_max": float(offer.salary_max) if offer.salary_max else None,
+            "mode": offer.mode,
+            "is_urgent": offer.is_urgent,
+        }
+
+    def build_candidate(self, app):
+        candidate = app.candidate
+        if not candidate:
+            raise ValueError("Candidato no asociado a la postulación")
+
+        skills = list(candidate.skills.all())
+        experiences = list(candidate.experiences.all())
+
+        def detail(cs, with_category=False):
+            item = {"name": cs.skill.name}
+            if with_category:
+                item["category"] = cs.skill.category
+            item["level"] = PROFICIENCY_LABELS.get(cs.proficiency_level, None)
+            return item
+
+        return {
+            "id": str(candidate.id),
+            "name": candidate.name,
+            "short_bio": candidate.short_bio,
+            "experience": [
+                exp.description or f"{exp.position} en {exp.company_name}"
+                for exp in experiences
+            ],
+            "education_level": candidate.education_level,
+            "skills": [
+                detail(cs, with_category=True)
+                for cs in skills
+                if cs.skill.category in ["Técnica", "Blanda"]
+            ],
+            "experience_years": calculate_experience_years(candidate),
+            "certifications_count": app.certifications_count,
+            "languages": [detail(cs) for cs in skills if cs.skill.category == "Idioma"],
+            "ofimatic": [
+                detail(cs) for cs in skills if cs.skill.category == "Ofimática"
+            ],
+            "cv_pdf_base64": pdf_reference(candidate.cv_file),
+            # Solo la huella ya guardada: los CVs antiguos sin huella se envían
+            # en base64 hasta que `backfill_cv_sha256` la calcule
+            "cv_sha256": candidate.cv_sha256,
+            "university_name": app.university_name,
+            "age": (
+                (timezone.now().year - candidate.birth_date.year)
+                if candidate.birth_date
+                else None
+            ),
+            "availability": candidate.availability,
+            "created_at": app.created_at.isoformat() if app.created_at else None,
+        }
+
+    def build(self):
+        """
+        Retorna el payload completo y la lista de postulaciones que no se
+        pudieron armar.
+        """
+        payload = {**self.build_header(), "candidates": []}
+        errors = []
+
+        for app in self.applications:
+            try:
+                payload["candidates"].append(self.build_candidate(app))
+            except Exception as e:
+                print(
+                    f"⚠️ Error con candidato {getattr(app.candidate, 'name', 'Desconocido')}: {e}"
+                )
+                errors.append(
+                    {
+                        "application_id": str(app.id),
+                        "candidate_name": getattr(app.candidate, "name", "Sin nombre"),
+                        "error": str(e),
+                    }
+                )
+
+        return payload, errors
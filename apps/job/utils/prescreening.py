@@ -0,0 +1,156 @@
+"""
+Preselección local: puntaje estructural de los postulantes de una oferta
+calculado en el proceso, sin llamar al evaluador (BACKIA).
+"""
+
+import numpy as np
+
+from apps.candidate.choices import EducationNivelChoices
+from apps.job.utils.payload import OfferPayloadBuilder
+from apps.job.utils.utils import calculate_experience_years
+
+EDUCATION_RANK = {
+    EducationNivelChoices.TC: 1,
+    EducationNivelChoices.BC: 2,
+    EducationNivelChoices.LI: 3,
+    EducationNivelChoices.DI: 3,
+    EducationNivelChoices.ES: 4,
+    EducationNivelChoices.MA: 5,
+    EducationNivelChoices.DO: 6,
+}
+MAX_PROFICIENCY = 3
+# Valores a partir de los cuales el criterio se considera cubierto
+EXPERIENCE_YEARS_CAP = 10
+CERTIFICATES_CAP = 5
+
+FEATURES = ("skills", "experience", "education", "certifications")
+WEIGHTS = np.array([0.6, 0.2, 0.1, 0.1])
+
+
+class PrescreeningEngine:
+    """
+    Codifica a los postulantes como arreglos de NumPy y los puntúa (0-100)
+    en una sola pasada contra las skills de la oferta:
+
+    - skills: nivel de dominio promedio sobre las skills que pide la oferta.
+    - experience, education, certifications: normalizados a [0, 1].
+
+    Reutiliza las postulaciones precargadas de `OfferPayloadBuilder`, así
+    que no agrega consultas por postulante.
+    """
+
+    def __init__(self, offer, applications=None):
+        self.offer = offer
+        self.applications = (
+            OfferPayloadBuilder(offer).applications
+            if applications is None
+            else list(applications)
+        )
+        self._scores = None
+
+    def offer_skill_ids(self):
+        return list(
+            self.offer.skills_joboffert.order_by()
+            .values_list("skill_id", flat=True)
+            .distinct()
+        )
+
+    def encode(self):
+        """Retorna la matriz de características (postulantes × FEATURES)."""
+        skill_ids = self.offer_skill_ids()
+        skill_index = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+        count = len(self.applications)
+
+        proficiency = np.zeros((count, len(skill_ids)))
+        experience = np.zeros(count)
+        education = np.zeros(count)
+        certifications = np.zeros(count)
+
+        for row, app in enumerate(self.applications):
+            candidate = app.candidate
+            for cs in candidate.skills.all():
+                column = skill_index.get(cs.skill_id)
+                if column is not None:
+                    proficiency[row, column] = cs.proficiency_level or 0
+            experience[row] = calculate_experience_years(candidate)
+            education[row] = EDUCATION_RANK.get(candidate.education_level, 0)
+            certifications[row] = getattr(app, "certifications_count", 0) or 0
+
+        skills = (
+            (proficiency / MAX_PROFICIENCY).mean(axis=1)
+            if skill_ids
+            else np.ones(count)
+        )
+        return np.column_stack(
+            [
+                skills,
+                np.minimum(experience / EXPERIENCE_YEARS_CAP, 1),
+                education / max(EDUCATION_RANK.values()),
+                np.minimum(certifications / CERTIFICATES_CAP, 1),
+            ]
+        )
+
+    @property
+    def features(self):
+        if self._scores is None:
+            self.score()
+        return self._features
+
+    def score(self):
+        """Puntaje de cada postulación, en el orden de `applications`."""
+        if self._scores is None:
+            self._features = self.encode().reshape(-1, len(FEATURES))
+            self._scores = np.round(self._features @ WEIGHTS * 100, 2)
+        return self._scores
+
+    def breakdown(self, row):
+        return {
+            name: round(float(value) * 100, 2)
+            for name, value in zip(FEATURES, self.features[row])
+        }
+
+    def shortlist(self, limit=None):
+        """Postulaciones ordenadas de mayor a menor puntaje."""
+        scores = self.score()
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            {
+                "application": self.applications[row],
+                "score": float(scores[row]),
+                "breakdown": self.breakdown(row),
+            }
+            for row in order
+        ]
+
+    def below(self, threshold):
+        """Postulaciones cuyo puntaje no alcanza `threshold`."""
+        scores = self.score()
+        return [
+            {
+                "application": self.applications[row],
+                "score": float(scores[row]),
+                "breakdown": self.breakdown(row),
+            }
+            for row in np.flatnonzero(scores < threshold)
+        ]
+
+    def as_result(self, items, label):
+        """
+        Arma un resultado con el mismo formato que la respuesta del
+        evaluador, para guardarlo con `save_evaluation_results`.
+        """
+        return {
+            "candidates": [
+                {
+                    "id": str(item["application"].candidate_id),
+                    "name": item["application"].candidate.name,
+                    "structural_score": item["score"],
+                    "fairness_structural_score": item["score"],
+                    "fairness_overall_score": item["score"],
+                    "structural_breakdown": item["breakdown"],
+                    "decision_label": label,
+                }
+                for item in items
+            ],
+            "selection_summary": [],
+        }
@@ -0,0 +1,106 @@
+"""
+Recomendación de ofertas por skills. El índice invertido (skill -> ofertas
+activas) se arma con una sola consulta y se guarda en caché; las señales de
+`JobSkill` y `JobOffers` lo invalidan, y la huella de los datos en la clave
+cubre los cambios hechos desde otros procesos.
+"""
+
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.base.cache import get_cache_version
+from apps.candidate.choices import ProficiencyChoices
+from apps.job.models import JobSkill
+from apps.job.utils.cache import SKILL_INDEX_CACHE, skill_index_fingerprint
+
+MAX_PROFICIENCY = max(ProficiencyChoices.values)
+
+# Copia del índice en el proceso, para no deserializarlo en cada petición
+_local = {"key": None, "index": None}
+
+
+class SkillIndex:
+    """
+    Índice invertido de skills a ofertas activas. Cada skill pesa según su
+    IDF: una skill que piden pocas ofertas distingue más que una que piden
+    todas.
+    """
+
+    def __init__(self, rows):
+        self.postings = defaultdict(list)
+        self.end_dates = {}
+        for skill_id, offer_id, end_date in rows:
+            self.postings[skill_id].append(offer_id)
+            self.end_dates[offer_id] = end_date
+
+        total = len(self.end_dates)
+        self.idf = {
+            skill_id: math.log(1 + total / len(offers))
+            for skill_id, offers in self.postings.items()
+        }
+        # Peso total de cada oferta, para normalizar el puntaje a [0, 1]
+        self.offer_weight = defaultdict(float)
+        for skill_id, offers in self.postings.items():
+            for offer_id in offers:
+                self.offer_weight[offer_id] += self.idf[skill_id]
+
+    @classmethod
+    def build(cls):
+        return cls(
+            JobSkill.objects.filter(jobOffers__is_active=True)
+            .order_by()
+            .values_list("skill_id", "jobOffers_id", "jobOffers__end_date")
+            .distinct()
+        )
+
+    def rank(self, proficiencies, limit=20, today=None):
+        """
+        Ofertas ordenadas por coincidencia ponderada con las skills del
+        candidato (`{skill_id: proficiency_level}`). Solo recorre las listas
+        de las skills del candidato. Retorna `[(offer_id, score, skill_ids)]`.
+        """
+        today = today or timezone.localdate()
+        scores = defaultdict(float)
+        matched = defaultdict(list)
+        for skill_id, proficiency in proficiencies.items():
+            idf = self.idf.get(skill_id)
+            if idf is None:
+                continue
+            weight = idf * (proficiency or 0) / MAX_PROFICIENCY
+            for offer_id in self.postings[skill_id]:
+                scores[offer_id] += weight
+                matched[offer_id].append(skill_id)
+
+        candidates = (
+            (score / self.offer_weight[offer_id], offer_id)
+            for offer_id, score in scores.items()
+            if self.end_dates[offer_id] is None or self.end_dates[offer_id] >= today
+        )
+        return [
+            (offer_id, round(score, 4), matched[offer_id])
+            for score, offer_id in heapq.nlargest(limit, candidates)
+        ]
+
+
+def get_skill_index():
+    # La versión cambia con las señales de este proceso; la huella, con
+    # cualquier cambio en la base, aunque lo haga otro proceso
+    key = "{}:{}:{}".format(
+        SKILL_INDEX_CACHE,
+        get_cache_version(SKILL_INDEX_CACHE),
+        skill_index_fingerprint(),
+    )
+    if _local["key"] == key:
+        return _local["index"]
+
+    index = cache.get(key)
+    if index is None:
+        index = SkillIndex.build()
+        cache.set(key, index, settings.SKILL_INDEX_CACHE_TIMEOUT)
+    _local.update(key=key, index=index)
+    return index
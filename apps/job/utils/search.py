@@ -0,0 +1,156 @@
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+
+from apps.job.choices import ModeChoices, TypeJobChoices
+from apps.job.models import SEARCH_CONFIG, JobOffers, JobSkill
+
+# Rangos de salario (según el salario mínimo de la oferta) para las facetas
+SALARY_BUCKETS = [
+    ("0-1500", 0, 1500),
+    ("1500-3000", 1500, 3000),
+    ("3000-5000", 3000, 5000),
+    ("5000+", 5000, None),
+]
+
+
+def split_param(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def parse_decimal(value):
+    try:
+        return Decimal(value) if value not in (None, "") else None
+    except InvalidOperation:
+        return None
+
+
+class OfferSearch:
+    """
+    Búsqueda de ofertas activas por texto (vector con stemming en español)
+    y filtros. Las facetas son disyuntivas: el conteo de cada filtro aplica
+    todos los demás filtros menos el propio, así el usuario ve cuántas
+    ofertas obtendría al cambiar ese valor.
+    """
+
+    def __init__(self, params, queryset=None):
+        self.initial = (
+            JobOffers.objects.filter(is_active=True) if queryset is None else queryset
+        )
+        self.text = (params.get("q") or "").strip()
+        self.modes = split_param(params.get("mode"))
+        self.employment_types = split_param(params.get("employment_type"))
+        self.skills = split_param(params.get("skill"))
+        self.salary_min = parse_decimal(params.get("salary_min"))
+        self.salary_max = parse_decimal(params.get("salary_max"))
+        urgent = (params.get("is_urgent") or "").lower()
+        self.is_urgent = {"true": True, "false": False}.get(urgent)
+
+    @property
+    def search_query(self):
+        return SearchQuery(self.text, config=SEARCH_CONFIG, search_type="websearch")
+
+    def base_queryset(self):
+        queryset = self.initial
+        if self.text:
+            queryset = queryset.filter(search_vector=self.search_query)
+        return queryset
+
+    def filters(self):
+        """Filtros activos por nombre de faceta."""
+        filters = {}
+        if self.modes:
+            filters["mode"] = Q(mode__in=self.modes)
+        if self.employment_types:
+            filters["employment_type"] = Q(employment_type__in=self.employment_types)
+        if self.is_urgent is not None:
+            # Las ofertas sin marcar cuentan como no urgentes
+            urgent = Q(is_urgent=True)
+            filters["is_urgent"] = urgent if self.is_urgent else ~urgent
+        if self.skills:
+            # Subconsulta en vez de join para no duplicar filas en los conteos
+            filters["skill"] = Q(
+                id__in=JobSkill.objects.filter(skill__name__in=self.skills).values(
+                    "jobOffers"
+                )
+            )
+        salary = Q()
+        if self.salary_min is not None:
+            salary &= Q(salary_max__gte=self.salary_min) | Q(
+                salary_max__isnull=True, salary_min__gte=self.salary_min
+            )
+        if self.salary_max is not None:
+            salary &= Q(salary_min__lte=self.salary_max) | Q(
+                salary_min__isnull=True, salary_max__lte=self.salary_max
+            )
+        if salary:
+            filters["salary"] = salary
+        return filters
+
+    def combined(self, exclude=None):
+        condition = Q()
+        for name, q in self.filters().items():
+            if name != exclude:
+                condition &= q
+        return condition
+
+    def queryset(self):
+        queryset = self.base_queryset().filter(self.combined())
+        if self.text:
+            # ts_rank retorna real; en double precision el valor del cursor
+            # se compara sin pérdida
+            queryset = queryset.annotate(
+                rank=Cast(
+                    SearchRank(F("search_vector"), self.search_query), FloatField()
+                )
+            )
+        return queryset
+
+    def facets(self):
+        """
+        Conteos de todas las facetas: una consulta agregada para las de
+        valores fijos y otra agrupada para las skills.
+        """
+        options = {
+            "mode": [(value, Q(mode=value)) for value in ModeChoices.values],
+            "employment_type": [
+                (value, Q(employment_type=value)) for value in TypeJobChoices.values
+            ],
+            "is_urgent": [("true", Q(is_urgent=True)), ("false", ~Q(is_urgent=True))],
+            "salary": [
+                (
+                    label,
+                    Q(salary_min__gte=low) & (Q(salary_min__lt=high) if high else Q()),
+                )
+                for label, low, high in SALARY_BUCKETS
+            ],
+        }
+
+        aggregates = {
+            f"{name}__{i}": Count("id", filter=self.combined(exclude=name) & q)
+            for name, values in options.items()
+            for i, (_, q) in enumerate(values)
+        }
+        counts = self.base_queryset().aggregate(**aggregates)
+
+        facets = {
+            name: [
+                {"value": value, "count": counts[f"{name}__{i}"]}
+                for i, (value, _) in enumerate(values)
+            ]
+            for name, values in options.items()
+        }
+        facets["skill"] = [
+            {"value": row["skill__name"], "count": row["count"]}
+            for row in JobSkill.objects.filter(
+                jobOffers__in=self.base_queryset().filter(
+                    self.combined(exclude="skill")
+                )
+            )
+            .values("skill__name")
+            .annotate(count=Count("jobOffers", distinct=True))
+            .order_by("-count", "skill__name")
+        ]
+        return facets
@@ -0,0 +1,136 @@
+"""
+Datos del candidato que se guardan en cada postulación
+(`JobApplications.snapshot`).
+"""
+
+import hashlib
+import json
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.candidate.models import Candidate, CandidateSkill
+
+
+def snapshot_queryset():
+    """Candidatos con todo lo que usa el snapshot, en un número fijo de consultas."""
+    return Candidate.objects.select_related("user").prefetch_related(
+        Prefetch("skills", queryset=CandidateSkill.objects.select_related("skill")),
+        "experiences",
+        "educations",
+    )
+
+
+def build_snapshot(candidate):
+    """Snapshot de un candidato ya cargado con `snapshot_queryset`."""
+    return {
+        "name": candidate.name,
+        "email": candidate.user.email if candidate.user else None,
+        "document_type": candidate.document_type,
+        "document_number": candidate.document_number,
+        "country": candidate.country,
+        "photograph": candidate.photograph.url if candidate.photograph else None,
+        "gender": candidate.gender,
+        "birth_date": str(candidate.birth_date),
+        "education_level": candidate.education_level,
+        "location": candidate.location,
+        "short_bio": candidate.short_bio,
+        "cv_file": candidate.cv_file.url if candidate.cv_file else None,
+        "linkedin_url": candidate.linkedin_url,
+        "portfolio_url": candidate.portfolio_url,
+        "has_recommendation": candidate.has_recommendation,
+        "availability": candidate.availability,
+        "skills": [
+            {"skill": s.skill.name, "proficiency_level": s.proficiency_level}
+            for s in candidate.skills.all()
+        ],
+        "experiences": [
+            {
+                "company_name": e.company_name,
+                "position": e.position,
+                "start_date": str(e.start_date) if e.start_date else None,
+                "end_date": str(e.end_date) if e.end_date else None,
+                "description": e.description,
+            }
+            for e in candidate.experiences.all()
+        ],
+        "educations": [
+            {
+                "institution": edu.institution,
+                "degree": edu.degree,
+                "field_of_study": edu.field_of_study,
+                "start_date": str(edu.start_date) if edu.start_date else None,
+                "end_date": str(edu.end_date) if edu.end_date else None,
+                "is_study": edu.is_study,
+                "description": edu.description,
+            }
+            for edu in candidate.educations.all()
+        ],
+    }
+
+
+def build_snapshots(candidate_ids):
+    """
+    Snapshots de un lote de candidatos con cuatro consultas, sin importar el
+    tamaño del lote. Retorna `{candidate_id: snapshot}`.
+    """
+    return {
+        candidate.pk: build_snapshot(candidate)
+        for candidate in snapshot_queryset().filter(pk__in=set(candidate_ids))
+    }
+
+
+def snapshot_digest(data):
+    """SHA-256 del JSON canónico (claves ordenadas, sin espacios)."""
+    canonical = json.dumps(
+        data,
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def store_snapshots(snapshots):
+    """
+    Guarda los snapshots `{candidate_id: data}` que aún no existan (de los
+    repetidos solo se renueva `used_at`, para que la limpieza no los borre
+    mientras se guarda la postulación) y retorna `{candidate_id: digest}`.
+    """
+    CandidateSnapshot = apps.get_model("job", "CandidateSnapshot")
+
+    digests = {
+        candidate_id: snapshot_digest(data) for candidate_id, data in snapshots.items()
+    }
+    unique = {digests[candidate_id]: data for candidate_id, data in snapshots.items()}
+    now = timezone.now()
+    CandidateSnapshot.objects.bulk_create(
+        [
+            CandidateSnapshot(digest=digest, data=data, used_at=now)
+            for digest, data in unique.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["digest"],
+        update_fields=["used_at"],
+    )
+    return digests
+
+
+def get_snapshot_data(digest):
+    """Datos de un snapshot; como no cambian nunca, se guardan en caché sin vencimiento."""
+    key = f"candidatesnapshot:{digest}"
+    data = cache.get(key)
+    if data is None:
+        CandidateSnapshot = apps.get_model("job", "CandidateSnapshot")
+        data = (
+            CandidateSnapshot.objects.filter(digest=digest)
+            .values_list("data", flat=True)
+            .first()
+        )
+        if data is not None:
+            cache.set(key, data, None)
+    return data
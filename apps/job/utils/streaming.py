@@ -0,0 +1,70 @@
+import base64
+import json
+
+# Debe ser múltiplo de 3 para que los bloques en base64 se puedan concatenar
+CV_BLOCK_SIZE = 3 * 64 * 1024
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+class Base64File:
+    """
+    Referencia a un archivo que se codifica en base64 recién al serializar
+    el payload, por bloques de tamaño fijo.
+    """
+
+    def __init__(self, path, block_size=CV_BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+
+    def iter_base64(self):
+        with open(self.path, "rb") as f:
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                yield base64.b64encode(block).decode("ascii")
+
+
+def iter_json(value):
+    """Serializa `value` a JSON por fragmentos, expandiendo los `Base64File`."""
+    if isinstance(value, Base64File):
+        yield '"'
+        yield from value.iter_base64()
+        yield '"'
+    elif isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield ", "
+            yield json.dumps(str(key))
+            yield ": "
+            yield from iter_json(item)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield "["
+        for i, item in enumerate(value):
+            if i:
+                yield ", "
+            yield from iter_json(item)
+        yield "]"
+    else:
+        yield json.dumps(value)
+
+
+def iter_payload_json(payload, buffer_size=WRITE_BUFFER_SIZE):
+    """
+    Genera el cuerpo de la petición como bytes: primero la cabecera de la
+    oferta y luego un candidato a la vez. Los fragmentos pequeños se agrupan
+    para no enviar chunks HTTP diminutos.
+    """
+    buffer = []
+    size = 0
+    for fragment in iter_json(payload):
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= buffer_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
@@ -0,0 +1,73 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Acumula el tiempo (en segundos) de cada etapa de una evaluación. Es
+    seguro usarlo desde los hilos que envían los lotes.
+
+    Las etapas son tiempo de reloj del hilo que las abre. Lo que se mide en
+    otros hilos mientras tanto (codificar lotes en paralelo) no se puede
+    descontar de ese tiempo: se suma aparte en `<etapa>_threads`.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open_stages(self):
+        if not hasattr(self._local, "stages"):
+            self._local.stages = []
+        return self._local.stages
+
+    def _add_nested(self, name, within, elapsed):
+        # Solo se descuenta de `within` si la abrió este mismo hilo
+        if within and within in self._open_stages():
+            self.add(name, elapsed)
+            self.add(within, -elapsed)
+        elif within:
+            self.add(f"{name}_threads", elapsed)
+        else:
+            self.add(name, elapsed)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name, within=None):
+        stages = self._open_stages()
+        stages.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stages.pop()
+            self._add_nested(name, within, elapsed)
+
+    def iter(self, name, iterable, within=None):
+        """
+        Recorre `iterable` midiendo el tiempo que toma generar cada elemento.
+        Si se indica `within`, ese tiempo se descuenta de esa etapa (por
+        ejemplo, codificar el cuerpo mientras se envía por la red) cuando la
+        abrió el mismo hilo.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._add_nested(name, within, time.perf_counter() - start)
+            yield item
+
+    def as_dict(self):
+        return {
+            name: round(max(seconds, 0.0), 4) for name, seconds in self.timings.items()
+        }
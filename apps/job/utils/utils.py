@@ -3,6 +3,7 @@ from datetime import date, datetime
 import requests
 import os
 from apps.job.choices import ResultChoices
+from apps.job.utils.streaming import Base64File
 from django.conf import settings
 
 def base64_pdf(file_field) -> str | None:
@@ -21,6 +22,21 @@ def base64_pdf(file_field) -> str | None:
         return base64.b64encode(f.read()).decode("utf-8")
 
 
+def pdf_reference(file_field) -> Base64File | None:
+    """
+    Igual que `base64_pdf`, pero no lee el archivo: retorna una referencia que
+    se codifica por bloques al momento de enviar el payload.
+    """
+    if not file_field or not getattr(file_field, "path", None):
+        return None
+
+    path = file_field.path
+    if not os.path.exists(path):
+        return None
+
+    return Base64File(path)
+
+
 def calculate_experience_years(candidate):
     """
     Calcula los años totales de experiencia laboral de un candidato.
@@ -1,6 +1,16 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
 from rest_framework import viewsets
-from apps.job.models import JobOffers, JobApplications
-from apps.candidate.models import Candidate
+from apps.base.cache import get_cache_version, queryset_fingerprint
+from apps.base.conditional import conditional_response, make_etag
+from apps.base.pagination import KeysetPagination, RankedPagination
+from apps.job.models import ApplicationsAiAnalysis, JobOffers, JobApplications, JobSkill
+from apps.maintenance.models import Company
+from apps.job.utils.cache import JOB_OFFERS_CACHE, job_offers_fingerprint
+from apps.job.utils.recommendations import get_skill_index
+from apps.job.utils.search import OfferSearch
+from apps.candidate.models import Candidate, CandidateSkill
 from apps.job.serializers import JobApplicationsFullSerializer, JobOffersSerializer, JobApplicationsSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -20,7 +30,101 @@ class JobOffersViewSet(viewsets.ModelViewSet):
     permission_classes = [ReadOnlyOrIsAuthenticated]
 
     def get_queryset(self):
-        return JobOffers.objects.filter(is_active=True)
+        return (
+            JobOffers.objects.filter(is_active=True)
+            .select_related("company")
+            .prefetch_related(
+                Prefetch(
+                    "skills_joboffert",
+                    queryset=JobSkill.objects.select_related("skill"),
+                ),
+                "requirements_joboffert",
+                "benefits_joboffert",
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        # 🔹 La clave cambia con la versión (señales) y con la huella de los
+        # datos, así otros procesos no sirven una respuesta desactualizada.
+        fingerprint = job_offers_fingerprint()
+        key = "{}:{}:{}:{}".format(
+            JOB_OFFERS_CACHE,
+            get_cache_version(JOB_OFFERS_CACHE),
+            fingerprint,
+            request.get_full_path(),
+        )
+
+        def build():
+            data = cache.get(key)
+            if data is None:
+                data = super(JobOffersViewSet, self).list(request, *args, **kwargs).data
+                cache.set(key, data, settings.JOB_OFFERS_CACHE_TIMEOUT)
+            return Response(data)
+
+        # El ETag sale solo de la huella y la ruta: la versión es local a cada
+        # proceso y no serviría para comparar entre workers. Si el cliente ya
+        # tiene esta versión no se lee la caché ni se envía el cuerpo.
+        etag = make_etag(fingerprint, request.get_full_path())
+        return conditional_response(request, etag, build)
+
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        Búsqueda de texto completo con filtros (`mode`, `employment_type`,
+        `salary_min`, `salary_max`, `is_urgent`, `skill`) y el conteo de
+        cada faceta en la misma respuesta.
+        """
+        search = OfferSearch(request.query_params, queryset=self.get_queryset())
+        paginator = RankedPagination() if search.text else KeysetPagination()
+        page = paginator.paginate_queryset(search.queryset(), request, view=self)
+
+        response = paginator.get_paginated_response(
+            self.get_serializer(page, many=True).data
+        )
+        response.data["facets"] = search.facets()
+        return response
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="recommended",
+        permission_classes=[IsAuthenticated],
+    )
+    def recommended(self, request):
+        """
+        Ofertas activas que mejor coinciden con las skills del candidato,
+        ponderadas por su nivel de dominio y por lo poco comunes que son.
+        """
+        candidate = Candidate.objects.filter(user=request.user).first()
+        if not candidate:
+            return Response(
+                {"detail": "No se encontró candidato asociado."},
+                status=status.HTTP_200_OK,
+            )
+
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), 100)
+        except ValueError:
+            limit = 20
+
+        proficiencies = dict(
+            CandidateSkill.objects.filter(candidate=candidate).values_list(
+                "skill_id", "proficiency_level"
+            )
+        )
+        ranking = get_skill_index().rank(proficiencies, limit=max(limit, 1))
+
+        offers = self.get_queryset().in_bulk([offer_id for offer_id, _, _ in ranking])
+        data = []
+        for offer_id, score, skill_ids in ranking:
+            # 🔹 Una oferta desactivada después de armar el índice no se muestra
+            if offer_id not in offers:
+                continue
+            item = self.get_serializer(offers[offer_id]).data
+            item["match_score"] = score
+            item["matched_skills"] = [str(skill_id) for skill_id in skill_ids]
+            data.append(item)
+        return Response(data, status=status.HTTP_200_OK)
 
 class JobApplicationsViewSet(viewsets.ModelViewSet):
     queryset = JobApplications.objects.all()
@@ -45,19 +149,41 @@ class JobApplicationsViewSet(viewsets.ModelViewSet):
 
         queryset = (
             JobApplications.objects.filter(candidate=candidate)
-            .prefetch_related("analysis", "joboffers__company")
+            .select_related("latest_analysis", "joboffers__company")
+            # 🔹 El historial `analysis` sigue en la respuesta; se carga en una
+            # sola consulta y sin la huella, que no se serializa
+            .prefetch_related(
+                Prefetch(
+                    "analysis",
+                    queryset=ApplicationsAiAnalysis.objects.defer("fingerprint"),
+                )
+            )
         )
 
         status_filter = request.query_params.get("status")
         if status_filter:
             estados = [s.strip() for s in status_filter.split(",")]
-            # 🔹 Filtramos en memoria según el último análisis
-            filtered = []
-            for app in queryset:
-                last_analysis = app.analysis.order_by("-created_at").first()
-                if last_analysis and last_analysis.status in estados:
-                    filtered.append(app)
-            queryset = filtered
-
-        serializer = JobApplicationsFullSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+            # 🔹 Filtramos en la base de datos según el último análisis
+            queryset = queryset.filter(latest_analysis__status__in=estados)
+
+        # 🔹 ETag con agregados (max updated_at y conteo) de todo lo que se
+        # muestra, sin serializar las postulaciones
+        etag = make_etag(
+            queryset_fingerprint(
+                JobApplications.objects.filter(candidate=candidate),
+                ApplicationsAiAnalysis.objects.filter(
+                    jobApplications__candidate=candidate
+                ),
+                JobOffers.objects.filter(jobapplication_joboffers__candidate=candidate),
+                Company.objects.filter(
+                    company_joboffers__jobapplication_joboffers__candidate=candidate
+                ),
+            ),
+            request.get_full_path(),
+        )
+
+        def build():
+            serializer = JobApplicationsFullSerializer(queryset, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return conditional_response(request, etag, build, private=True)
\ No newline at end of file
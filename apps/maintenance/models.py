@@ -11,6 +11,9 @@ class Skill(BaseModel):
         verbose_name='Habilidad'
         verbose_name_plural= 'Habilidades'
         ordering = ('created_at',)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='skill_keyset_idx'),
+        ]
 
     def __str__(self):
         return self.name
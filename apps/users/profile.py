@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Max, Prefetch
+
+from apps.candidate.models import Candidate, CandidateSkill
+
+User = get_user_model()
+
+PROFILE_CACHE = "profile"
+
+
+def profile_queryset():
+    """
+    Usuario con su candidato y todo lo que muestra el perfil: seis consultas
+    sin importar cuántas skills, experiencias o certificados tenga.
+    """
+    return User.objects.prefetch_related(
+        Prefetch(
+            "account_candidate",
+            queryset=Candidate.objects.prefetch_related(
+                Prefetch(
+                    "skills", queryset=CandidateSkill.objects.select_related("skill")
+                ),
+                "experiences",
+                "educations",
+                "certificates",
+            ),
+        )
+    )
+
+
+def profile_cache_key(request):
+    """
+    Clave del perfil del usuario: cambia con cualquier modificación del
+    usuario (`updated_at`), del perfil del candidato (`profile_version`) o
+    de las skills que muestra (el nombre vive en `Skill`). Se obtiene con
+    una sola consulta liviana.
+    """
+    user = request.user
+    candidate = (
+        Candidate.objects.filter(user=user)
+        .annotate(skills_updated_at=Max("skills__skill__updated_at"))
+        .values_list("pk", "profile_version", "skills_updated_at")
+        .first()
+    )
+    updated_at = user.updated_at.timestamp() if user.updated_at else None
+    if candidate:
+        pk, version, skills_updated_at = candidate
+        if skills_updated_at:
+            skills_updated_at = skills_updated_at.timestamp()
+        candidate = f"{pk}.{version}.{skills_updated_at}"
+    return "{}:{}:{}:{}:{}".format(
+        PROFILE_CACHE,
+        user.pk,
+        updated_at,
+        candidate,
+        # Las URLs de archivos son absolutas y dependen del host
+        request.build_absolute_uri("/"),
+    )
@@ -17,7 +17,10 @@ from rest_framework import status
 from django.utils.crypto import get_random_string
 from datetime import timedelta
 from apps.users.models import PasswordResetToken
+from apps.users.profile import profile_cache_key, profile_queryset
+from apps.base.conditional import conditional_response, make_etag
 from django.conf import settings
+from django.core.cache import cache
 from datetime import timedelta
 from sendgrid.helpers.mail import Mail
 from sendgrid import SendGridAPIClient
@@ -28,6 +31,8 @@ User = get_user_model()
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    # created_at puede ser nulo en usuarios antiguos, no sirve de cursor
+    pagination_class = None
 
     def get_permissions(self):
         print(self.action)
@@ -86,8 +91,19 @@ class UserViewSet(viewsets.ModelViewSet):
     # 🔹 Acción personalizada para ver perfil
     @action(detail=False, methods=["get"], url_path="profile")
     def profile(self, request):
-        serializer = UserSerializer(request.user, context={"request": request})
-        return Response(serializer.data)
+        # 🔹 Se guarda el JSON ya armado; la clave cambia con cada escritura
+        # del usuario o de su perfil, así no hace falta borrarla.
+        key = profile_cache_key(request)
+
+        def build():
+            data = cache.get(key)
+            if data is None:
+                user = profile_queryset().get(pk=request.user.pk)
+                data = UserSerializer(user, context={"request": request}).data
+                cache.set(key, data, settings.PROFILE_CACHE_TIMEOUT)
+            return Response(data)
+
+        return conditional_response(request, make_etag(key), build, private=True)
 
     @action(
         detail=False,
@@ -50,6 +50,7 @@ BASE_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "corsheaders",
@@ -102,6 +103,45 @@ CORS_ALLOW_CREDENTIALS = True
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
 
 BACKIA = os.getenv("BACKIA", "http://3.143.113.222") 
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "2"))
+# Cada cuántos segundos un worker renueva el trabajo que está evaluando, y
+# tras cuántos sin renovar se considera abandonado y otro worker lo retoma
+EVALUATION_JOB_HEARTBEAT = float(os.getenv("EVALUATION_JOB_HEARTBEAT", "30"))
+EVALUATION_JOB_LEASE = float(os.getenv("EVALUATION_JOB_LEASE", "300"))
+# Envío por lotes al evaluador (0 desactiva el modo por lotes)
+BACKIA_CHUNK_SIZE = int(os.getenv("BACKIA_CHUNK_SIZE", "25"))
+BACKIA_MAX_WORKERS = int(os.getenv("BACKIA_MAX_WORKERS", "4"))
+BACKIA_CHUNK_RETRIES = int(os.getenv("BACKIA_CHUNK_RETRIES", "2"))
+# Enviar solo la huella (SHA-256) de los CVs que el evaluador ya conoce
+BACKIA_CV_BY_DIGEST = os.getenv("BACKIA_CV_BY_DIGEST", "True") == "True"
+# Timeouts (segundos) y reintentos del cliente del evaluador
+BACKIA_CONNECT_TIMEOUT = float(os.getenv("BACKIA_CONNECT_TIMEOUT", "5"))
+BACKIA_TIMEOUT_BASE = float(os.getenv("BACKIA_TIMEOUT_BASE", "30"))
+BACKIA_TIMEOUT_MAX = float(os.getenv("BACKIA_TIMEOUT_MAX", "900"))
+BACKIA_TIMEOUT_FACTOR = float(os.getenv("BACKIA_TIMEOUT_FACTOR", "2"))
+# Latencia por candidato mientras no haya datos en TimeMetrics
+BACKIA_SECONDS_PER_CANDIDATE = float(os.getenv("BACKIA_SECONDS_PER_CANDIDATE", "5"))
+BACKIA_RETRIES = int(os.getenv("BACKIA_RETRIES", "3"))
+BACKIA_BACKOFF = float(os.getenv("BACKIA_BACKOFF", "0.5"))
+# Preselección local: puntaje mínimo para enviar al evaluador (0 la desactiva)
+PRESCREENING_THRESHOLD = float(os.getenv("PRESCREENING_THRESHOLD", "0"))
+# Guardar el puntaje local cuando el evaluador no responde. Queda como un
+# análisis más (lo ve el candidato y entra en las métricas de exactitud), por
+# eso está desactivado salvo que se pida explícitamente.
+PRESCREENING_FALLBACK = os.getenv("PRESCREENING_FALLBACK", "False") == "True"
+# Por defecto las postulaciones solo marcan sus fechas y las recalcula
+# `flush_accuracy_metrics` periódicamente. Con True se recalculan al confirmar
+# cada transacción, lo que sin ATOMIC_REQUESTS es una vez por cada guardado.
+ACCURACY_METRICS_FLUSH_ON_COMMIT = (
+    os.getenv("ACCURACY_METRICS_FLUSH_ON_COMMIT", "False") == "True"
+)
+
+# Segundos que se guarda en caché el listado público de ofertas
+JOB_OFFERS_CACHE_TIMEOUT = int(os.getenv("JOB_OFFERS_CACHE_TIMEOUT", "300"))
+# Segundos que se guarda en caché el perfil de cada usuario
+PROFILE_CACHE_TIMEOUT = int(os.getenv("PROFILE_CACHE_TIMEOUT", "300"))
+# Segundos que se guarda en caché el índice de skills de las recomendaciones
+SKILL_INDEX_CACHE_TIMEOUT = int(os.getenv("SKILL_INDEX_CACHE_TIMEOUT", "3600"))
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -254,7 +294,18 @@ UNFOLD = {
             {
                 "title": "Gestión de Evaluaciones",
                 "separator": True,
-                "items": [],
+                "items": [
+                    {
+                        "title": "Evaluaciones en cola",
+                        "icon": "pending_actions",
+                        "link": reverse_lazy("admin:job_evaluationjob_changelist"),
+                    },
+                    {
+                        "title": "Tiempos de evaluación",
+                        "icon": "timer",
+                        "link": reverse_lazy("admin:job_timemetrics_changelist"),
+                    },
+                ],
             },
             {
                 "title": "Mantenimeinto",
@@ -296,7 +347,8 @@ ICON_EDIT_URL = "/static/admin/img/visible.png"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    ),
+    "DEFAULT_PAGINATION_CLASS": "apps.base.pagination.KeysetPagination",
 }
 
 SIMPLE_JWT = {